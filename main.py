@@ -1,18 +1,25 @@
 """
 Main script for hackathon commit history review system.
 """
+import asyncio
 import logging
 import sys
 import argparse
 from pathlib import Path
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 import traceback
 
-from src.core.models import HackathonConfig, AnalysisReport, TeamAnalysisResult
+from src.core.models import HackathonConfig, AnalysisReport, TeamAnalysisResult, RepositoryInfo
 from src.core.team_loader import CSVTeamLoader
-from src.core.github_client import GitHubClient
+from src.core.github_client import GitHubClient, GitHubAPIError
+from src.core.async_github_client import AsyncGitHubClient
+from src.core.git_backend import LocalGitBackend
 from src.core.analyzer import CommitAnalyzer
+from src.core.code_comparison import CodeComparisonEngine
+from src.core.scheduler import TeamScheduler
+from src.core.repo_state import RepositoryStateStore
+from src.core.checkpoint import CheckpointStore
 from config.hackathon_config import (
     HACKATHON_NAME, HACKATHON_START_TIME, HACKATHON_END_TIME,
     MAX_TEAM_SIZE, GRACE_PERIOD_HOURS, LARGE_COMMIT_THRESHOLD,
@@ -33,9 +40,15 @@ logger = logging.getLogger(__name__)
 class HackathonAnalysisSystem:
     """Main system for hackathon analysis."""
     
-    def __init__(self, teams_csv: str = None, reference_file: str = None):
+    def __init__(self, teams_csv: str = None, reference_file: str = None, workers: int = 1, backend: str = None,
+                 incremental: bool = False, checkpoint_file: str = None, resume: bool = False, index_file: str = None):
         self.teams_csv = teams_csv or TEAMS_CSV_FILE
         self.reference_file = reference_file
+        self.workers = workers
+        
+        from src.core.config import config
+        self.backend = backend or config.github.backend
+        self.stream_commits = config.github.stream_commits
         
         self.hackathon_config = HackathonConfig(
             name=HACKATHON_NAME,
@@ -50,10 +63,20 @@ class HackathonAnalysisSystem:
             from src.core.config import config
             config.analysis.reference_code_file = self.reference_file
         
+        if index_file:
+            config.analysis.reference_index_file = index_file
+        
         self.github_client = GitHubClient()
-        self.analyzer = CommitAnalyzer(self.hackathon_config, self.github_client)
+        self.async_github_client = AsyncGitHubClient(self.github_client)
+        self.git_backend = LocalGitBackend(github_client=self.github_client)
+        self.analyzer = CommitAnalyzer(self.hackathon_config, self.github_client,
+                                       self.git_backend if self.backend == "git" else None)
         self.team_loader = CSVTeamLoader(self.teams_csv)
+        self.state_store = RepositoryStateStore() if incremental else None
+        self.checkpoint = CheckpointStore(checkpoint_file or config.analysis.checkpoint_file)
+        self.resume = resume
         
+        self.graphql_results = {}
         self.successful_analyses = []
         self.failed_analyses = []
     
@@ -72,47 +95,64 @@ class HackathonAnalysisSystem:
         teams = self.team_loader.load_teams()
         logger.info(f"Loaded {len(teams)} teams from CSV")
         
+        if self.backend == "graphql":
+            logger.info(f"Fetching commit histories for {len(teams)} repositories via batched GraphQL")
+            self.graphql_results = asyncio.run(self.async_github_client.analyze_repositories_graphql(
+                [team_data.repository_url for team_data in teams]
+            ))
+        
+        if self.resume:
+            completed = self.checkpoint.load()
+        else:
+            self.checkpoint.reset()
+            completed = {}
+        logger.info(f"Checkpointing completed teams to {self.checkpoint.path}")
+        
+        logger.info(f"Running with {self.workers} parallel worker(s)")
+        
         team_results = []
-        for i, team_data in enumerate(teams):
-            logger.info(f"📊 Analyzing team {i+1}/{len(teams)}: {team_data.team_name}")
-            
-            try:
-                result = self._analyze_team(team_data)
-                team_results.append(result)
-                self.successful_analyses.append(team_data.team_name)
-                
-                status = "🚨 FLAGGED" if result.is_flagged else "✅ CLEAN"
-                logger.info(f"   {status} - {len(result.violations)} violations")
-                
-                if result.violations:
-                    violation_summary = {}
-                    for violation in result.violations:
-                        if violation.type.value not in violation_summary:
-                            violation_summary[violation.type.value] = {"high": 0, "medium": 0, "low": 0}
-                        violation_summary[violation.type.value][violation.severity] += 1
-                    
-                    for violation_type, severities in violation_summary.items():
-                        total = sum(severities.values())
-                        severity_breakdown = []
-                        if severities["high"] > 0:
-                            severity_breakdown.append(f"{severities['high']} high")
-                        if severities["medium"] > 0:
-                            severity_breakdown.append(f"{severities['medium']} medium")
-                        if severities["low"] > 0:
-                            severity_breakdown.append(f"{severities['low']} low")
-                        
-                        logger.info(f"     📋 {violation_type}: {total} ({', '.join(severity_breakdown)})")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to analyze {team_data.team_name}: {e}")
+        
+        def collect_result(index, team_data, outcome):
+            if isinstance(outcome, Exception):
+                logger.error(f"❌ Failed to analyze {team_data.team_name}: {outcome}")
                 self.failed_analyses.append({
                     'team_name': team_data.team_name,
-                    'error': str(e),
+                    'error': str(outcome),
                     'url': team_data.repository_url
                 })
                 
-                error_result = self._create_error_result(team_data, str(e))
+                error_result = self._create_error_result(team_data, str(outcome))
                 team_results.append(error_result)
+                return
+            
+            team_results.append(outcome)
+            self.successful_analyses.append(team_data.team_name)
+            self._log_team_result(index, len(teams), outcome)
+        
+        async def analyze(index, team_data):
+            if team_data.team_id in completed:
+                logger.info(f"⏭️  Skipping team {index+1}/{len(teams)}: {team_data.team_name} (already in checkpoint)")
+                return completed[team_data.team_id]
+            
+            logger.info(f"📊 Analyzing team {index+1}/{len(teams)}: {team_data.team_name}")
+            result = await self._analyze_team(team_data)
+            await asyncio.to_thread(self.checkpoint.append, result)
+            return result
+        
+        try:
+            TeamScheduler(self.workers).run(teams, analyze, collect_result)
+        finally:
+            self.analyzer.close()
+        
+        blob_store = self.github_client.blob_store
+        logger.info(f"📦 Blob store: {len(blob_store)} distinct files ({blob_store.size / 1e6:.1f} MB), "
+                    f"{blob_store.hits} reused, {blob_store.skipped} boilerplate skipped")
+        
+        changed_results = self.analyzer.apply_cross_team_matches(team_results)
+        if changed_results:
+            logger.info(f"🔁 Cross-team comparison updated code reuse violations for {len(changed_results)} team(s)")
+            repo_urls = {team_data.team_id: team_data.repository_url for team_data in teams}
+            self._persist_results(changed_results, repo_urls)
         
         analysis_report = self._generate_analysis_report(team_results)
         
@@ -123,22 +163,107 @@ class HackathonAnalysisSystem:
         
         return analysis_report
     
-    def _analyze_team(self, team_data) -> TeamAnalysisResult:
+    def _persist_results(self, results: List[TeamAnalysisResult], repo_urls: Dict[str, str]):
+        """Record updated results in the checkpoint and repository state."""
+        for result in results:
+            # The checkpoint keeps the last record per team, so appending replaces it.
+            self.checkpoint.append(result)
+            repo_url = repo_urls.get(result.team.team_id)
+            if self.state_store and repo_url:
+                self.state_store.save(repo_url, result.repository_info, result)
+    
+    def _log_team_result(self, index: int, total: int, result: TeamAnalysisResult):
+        """Log the outcome of a single team analysis."""
+        status = "🚨 FLAGGED" if result.is_flagged else "✅ CLEAN"
+        logger.info(f"   [{index+1}/{total}] {result.team.team_name}: {status} - {len(result.violations)} violations")
+        
+        if result.violations:
+            violation_summary = {}
+            for violation in result.violations:
+                if violation.type.value not in violation_summary:
+                    violation_summary[violation.type.value] = {"high": 0, "medium": 0, "low": 0}
+                violation_summary[violation.type.value][violation.severity] += 1
+            
+            for violation_type, severities in violation_summary.items():
+                total_violations = sum(severities.values())
+                severity_breakdown = []
+                if severities["high"] > 0:
+                    severity_breakdown.append(f"{severities['high']} high")
+                if severities["medium"] > 0:
+                    severity_breakdown.append(f"{severities['medium']} medium")
+                if severities["low"] > 0:
+                    severity_breakdown.append(f"{severities['low']} low")
+                
+                logger.info(f"     📋 {violation_type}: {total_violations} ({', '.join(severity_breakdown)})")
+    
+    async def _analyze_team(self, team_data) -> TeamAnalysisResult:
         """Analyze a single team."""
         team = self.team_loader.convert_to_team_model(team_data)
+        repo_url = team_data.repository_url
+        
+        state = self.state_store.load(repo_url) if self.state_store else None
+        previous = None
+        repo_info = None
+        if state and self.backend in ("api", "git"):
+            head_sha = await self._get_head_sha(repo_url)
+            if head_sha == state.head_sha:
+                if state.result and state.result.team == team:
+                    logger.info(f"     No new commits for {team_data.team_name}, reusing previous analysis")
+                    return state.result
+                repo_info = state.repository_info
+            else:
+                previous = state.repository_info
         
-        logger.info(f"     Fetching repository data...")
-        repo_info = self.github_client.analyze_repository(team_data.repository_url)
+        commit_stream = None
+        if repo_info is None and previous is None and self.backend == "api" and self.stream_commits:
+            logger.info(f"     Streaming repository data for {team_data.team_name}...")
+            repo_info, commit_stream = await self.async_github_client.stream_repository(
+                repo_url,
+                detail_window=self._detail_window()
+            )
+        elif repo_info is None:
+            logger.info(f"     Fetching repository data for {team_data.team_name}...")
+            repo_info = await self._fetch_repository(repo_url, previous)
         
-        logger.info(f"     Running violation analysis...")
-        result = self.analyzer.analyze_team(team, repo_info)
+        logger.info(f"     Running violation analysis for {team_data.team_name}...")
+        result = await asyncio.to_thread(self.analyzer.analyze_team, team, repo_info, commit_stream)
+        
+        if self.state_store:
+            await asyncio.to_thread(self.state_store.save, repo_url, repo_info, result)
         
         return result
     
+    async def _get_head_sha(self, repo_url: str) -> str:
+        """Get the current head SHA of a team repository."""
+        if self.backend == "git":
+            return await asyncio.to_thread(self.git_backend.get_head_sha, repo_url)
+        return await self.async_github_client.get_head_sha(repo_url)
+    
+    async def _fetch_repository(self, repo_url: str, previous: Optional[RepositoryInfo] = None) -> RepositoryInfo:
+        """Fetch repository history with the configured backend."""
+        if self.backend == "git":
+            # git fetch only transfers new objects, so no merge step is needed.
+            return await asyncio.to_thread(self.git_backend.analyze_repository, repo_url)
+        
+        if self.backend == "graphql":
+            repo_info = self.graphql_results.get(repo_url)
+            if repo_info is None:
+                raise GitHubAPIError(f"No GraphQL history returned for {repo_url}")
+            return repo_info
+        
+        return await self.async_github_client.analyze_repository(
+            repo_url,
+            detail_window=self._detail_window(),
+            previous=previous
+        )
+    
+    def _detail_window(self) -> Tuple[datetime, datetime]:
+        """Allowed commit period, from the hackathon start to the end of the grace period."""
+        grace_end = self.hackathon_config.end_time + timedelta(hours=self.hackathon_config.grace_period_hours)
+        return self.hackathon_config.start_time, grace_end
+    
     def _create_error_result(self, team_data, error_msg: str) -> TeamAnalysisResult:
         """Create error result for failed analysis."""
-        from src.core.models import RepositoryInfo
-        
         team = self.team_loader.convert_to_team_model(team_data)
         
         error_repo = RepositoryInfo(
@@ -178,11 +303,40 @@ class HackathonAnalysisSystem:
         )
 
 
+def build_reference_index(reference_file: str = None, index_file: str = None) -> Path:
+    """Fingerprint the reference corpus and save the index for later runs."""
+    from src.core.config import config
+    analysis = config.analysis
+    
+    source = reference_file or analysis.reference_code_file
+    target = index_file or analysis.reference_index_file
+    if not source or not target:
+        raise ValueError("Both a reference source and an index file are required to build an index")
+    
+    engine = CodeComparisonEngine(
+        reference_file_path=source,
+        kgram_size=analysis.fingerprint_k,
+        window_size=analysis.fingerprint_window
+    )
+    if not len(engine.reference_index):
+        raise ValueError(f"No reference files found in {source}")
+    
+    engine.save_reference_index(target)
+    return Path(target)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
         description="HackUMBC Commit History Analysis System"
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["analyze", "build-index"],
+        default="analyze",
+        help="Analyze teams (default) or build the reference fingerprint index"
+    )
     parser.add_argument(
         "--teams-csv",
         type=str,
@@ -197,7 +351,38 @@ def main():
     parser.add_argument(
         "--reference-file",
         type=str,
-        help="Reference code file to compare against (overrides config/env)"
+        help="Reference code file, directory or .manifest to compare against (overrides config/env)"
+    )
+    parser.add_argument(
+        "--index-file",
+        type=str,
+        help="Saved reference fingerprint index to write or open (overrides config/env)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of teams to analyze in parallel"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["api", "git", "graphql"],
+        help="Fetch commit history from the REST API, a local git clone or batched GraphQL (overrides config/env)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse state from previous runs: fetch only new commits and skip teams whose head is unchanged"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        help="JSONL file completed team results are written to (overrides config/env)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip teams already completed in the checkpoint file"
     )
     
     args = parser.parse_args()
@@ -205,6 +390,15 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if args.command == "build-index":
+        try:
+            path = build_reference_index(args.reference_file, args.index_file)
+        except Exception as e:
+            logger.error(f"❌ Index build failed: {e}")
+            sys.exit(1)
+        print(f"✅ Reference index written to {path}")
+        return
+    
     print("\n" + "="*60)
     print("🔍 HackUMBC Commit History Analysis System")
     print("="*60)
@@ -212,7 +406,13 @@ def main():
     try:
         system = HackathonAnalysisSystem(
             teams_csv=args.teams_csv,
-            reference_file=args.reference_file
+            reference_file=args.reference_file,
+            workers=args.workers,
+            backend=args.backend,
+            incremental=args.incremental,
+            checkpoint_file=args.checkpoint,
+            resume=args.resume,
+            index_file=args.index_file
         )
         
         analysis_report = system.analyze_all_teams()
@@ -232,7 +432,7 @@ def main():
             print(f"🎉 All teams passed automated checks!")
         
         print("="*60)
-        
+    
     except KeyboardInterrupt:
         logger.info("⏸️  Analysis interrupted by user")
         sys.exit(1)
@@ -3,15 +3,19 @@ Commit analysis engine for detecting hackathon violations.
 """
 import logging
 from datetime import datetime, timedelta
-from typing import List
-from collections import Counter
+from typing import Iterable, List, Optional, Tuple, Type
+
+import numpy as np
 
 from .config import config
 from .models import (
     HackathonConfig, Team, TeamAnalysisResult, RepositoryInfo, 
-    Violation, ViolationType
+    Violation, ViolationType, CommitInfo, CodeFileFingerprints
 )
 from .code_comparison import CodeComparisonEngine
+from .commit_rules import DEFAULT_RULES, CommitRule
+from .commit_store import MICROSECONDS_PER_SECOND, CommitColumns, epoch_microseconds
+from .cross_team import CrossTeamDetector
 
 logger = logging.getLogger(__name__)
 
@@ -19,34 +23,57 @@ logger = logging.getLogger(__name__)
 class CommitAnalyzer:
     """Analyzes repository commits for hackathon rule violations."""
     
-    def __init__(self, hackathon_config: HackathonConfig, github_client=None):
+    def __init__(self, hackathon_config: HackathonConfig, github_client=None, git_backend=None):
         self.hackathon_config = hackathon_config
         self.analysis_config = config.analysis
         self.github_client = github_client
+        # With the git backend, code files are read from its clones instead of the API.
+        self.git_backend = git_backend
+        # Instantiated per repository and fed by one pass over its commits.
+        self.commit_rules: List[Type[CommitRule]] = list(DEFAULT_RULES)
         
         if self.analysis_config.reference_code_file:
             self.code_comparison_engine = CodeComparisonEngine(
                 reference_file_path=self.analysis_config.reference_code_file,
                 high_threshold=self.analysis_config.similarity_high_threshold,
-                medium_threshold=self.analysis_config.similarity_medium_threshold
+                medium_threshold=self.analysis_config.similarity_medium_threshold,
+                kgram_size=self.analysis_config.fingerprint_k,
+                window_size=self.analysis_config.fingerprint_window,
+                top_matches=self.analysis_config.reference_top_matches,
+                index_path=self.analysis_config.reference_index_file,
+                workers=self.analysis_config.comparison_workers,
+                chunk_size=self.analysis_config.comparison_chunk_size,
+                cache_size=self.analysis_config.comparison_cache_size
             )
         else:
             self.code_comparison_engine = None
+        
+        self.cross_team_enabled = bool(self.code_comparison_engine and self.analysis_config.cross_team_enabled)
     
-    def analyze_team(self, team: Team, repository_info: RepositoryInfo) -> TeamAnalysisResult:
-        """Analyze a team's repository for violations."""
+    def close(self):
+        """Release the code comparison worker pool."""
+        if self.code_comparison_engine:
+            self.code_comparison_engine.close()
+    
+    def analyze_team(self, team: Team, repository_info: RepositoryInfo,
+                     commits: Optional[Iterable[CommitInfo]] = None) -> TeamAnalysisResult:
+        """Analyze a team's repository for violations.
+        
+        ``commits`` overrides ``repository_info.commits`` and may be a
+        generator still fetching pages; it is consumed once, so ingestion
+        overlaps with fetching. Every commit is still kept: the built-in
+        rules run in ``finalize`` over the full columns, violations cite
+        commits as evidence, and the collected list is stored back on
+        ``repository_info`` for the incremental state.
+        """
         logger.info(f"Analyzing team: {team.team_name}")
         
-        violations = []
-        
-        violations.extend(self._check_commit_timing(repository_info))
-        violations.extend(self._check_unauthorized_contributors(team, repository_info))
-        violations.extend(self._check_large_initial_commits(repository_info))
-        violations.extend(self._check_excessive_contributors(team, repository_info))
-        violations.extend(self._check_suspicious_patterns(repository_info))
+        violations = self.run_commit_rules(team, repository_info, commits)
         
-        if self.github_client and self.code_comparison_engine:
-            violations.extend(self._check_code_reuse(team, repository_info))
+        code_files = []
+        if (self.github_client or self.git_backend) and self.code_comparison_engine:
+            code_violations, code_files = self._check_code_reuse(team, repository_info)
+            violations.extend(code_violations)
         
         summary = self._generate_summary(team, violations)
         
@@ -56,10 +83,25 @@ class CommitAnalyzer:
             violations=violations,
             is_flagged=any(v.severity == "high" for v in violations),
             summary=summary,
-            analysis_timestamp=datetime.now()
+            analysis_timestamp=datetime.now(),
+            code_files=code_files
         )
     
-    def _check_commit_timing(self, repo_info: RepositoryInfo) -> List[Violation]:
+    def run_commit_rules(self, team: Team, repository_info: RepositoryInfo,
+                         commits: Optional[Iterable[CommitInfo]] = None) -> List[Violation]:
+        """Run every commit rule over a single pass of the commits."""
+        rules = [rule(self, team, repository_info) for rule in self.commit_rules]
+        hooks = [rule.on_commit for rule in rules if type(rule).on_commit is not CommitRule.on_commit]
+        
+        columns = CommitColumns(repository_info.commits if commits is None else commits, hooks)
+        repository_info.commits = columns.commits
+        
+        violations = []
+        for rule in rules:
+            violations.extend(rule.finalize(columns))
+        return violations
+    
+    def _check_commit_timing(self, commits: CommitColumns) -> List[Violation]:
         """Check for commits outside the hackathon timeframe."""
         violations = []
         
@@ -67,19 +109,13 @@ class CommitAnalyzer:
             hours=self.hackathon_config.grace_period_hours
         )
         
-        early_commits = []
-        late_commits = []
-        
-        for commit in repo_info.commits:
-            if commit.timestamp < self.hackathon_config.start_time:
-                early_commits.append(commit)
-            elif commit.timestamp > grace_end:
-                late_commits.append(commit)
+        early_rows = np.flatnonzero(commits.timestamps < epoch_microseconds(self.hackathon_config.start_time))
+        late_rows = np.flatnonzero(commits.timestamps > epoch_microseconds(grace_end))
         
-        if early_commits:
-            severity = "high" if len(early_commits) > 5 or any(
-                c.total_changes > 100 for c in early_commits
-            ) else "medium"
+        if len(early_rows):
+            early_changes = commits.total_changes[early_rows]
+            early_commits = commits.rows(early_rows)
+            severity = "high" if len(early_rows) > 5 or (early_changes > 100).any() else "medium"
             
             violations.append(Violation(
                 type=ViolationType.COMMITS_OUTSIDE_WINDOW,
@@ -87,7 +123,7 @@ class CommitAnalyzer:
                 description=f"Found {len(early_commits)} commits before hackathon start",
                 evidence={
                     "early_commits": len(early_commits),
-                    "total_changes_before": sum(c.total_changes for c in early_commits),
+                    "total_changes_before": int(early_changes.sum()),
                     "commits": [
                         {
                             "sha": c.sha[:8],
@@ -99,31 +135,33 @@ class CommitAnalyzer:
                 }
             ))
         
-        if late_commits:
-            major_late_commits = [c for c in late_commits if c.total_changes > 50]
+        if len(late_rows):
+            major_late_commits = int((commits.total_changes[late_rows] > 50).sum())
             severity = "high" if major_late_commits else "low"
+            late_commits = commits.rows(late_rows[:5])
             
             violations.append(Violation(
                 type=ViolationType.COMMITS_OUTSIDE_WINDOW,
                 severity=severity,
-                description=f"Found {len(late_commits)} commits after deadline ({len(major_late_commits)} major)",
+                description=f"Found {len(late_rows)} commits after deadline ({major_late_commits} major)",
                 evidence={
-                    "late_commits": len(late_commits),
-                    "major_late_commits": len(major_late_commits),
+                    "late_commits": len(late_rows),
+                    "major_late_commits": major_late_commits,
                     "commits": [
                         {
                             "sha": c.sha[:8],
                             "timestamp": c.timestamp.isoformat(),
                             "changes": c.total_changes,
                             "message": c.message[:100]
-                        } for c in late_commits[:5]
+                        } for c in late_commits
                     ]
                 }
             ))
         
         return violations
     
-    def _check_unauthorized_contributors(self, team: Team, repo_info: RepositoryInfo) -> List[Violation]:
+    def _check_unauthorized_contributors(self, team: Team, repo_info: RepositoryInfo,
+                                         commits: CommitColumns) -> List[Violation]:
         """Check for contributors not on the team roster."""
         violations = []
         
@@ -133,13 +171,14 @@ class CommitAnalyzer:
         unauthorized = repo_contributors - team_members
         
         if unauthorized:
-            unauthorized_commits = [
-                commit for commit in repo_info.commits 
-                if any(username in commit.author.lower() or username in commit.author_email.lower() 
-                      for username in unauthorized)
-            ]
+            # Match each distinct author once, then expand to their commits.
+            unauthorized_authors = np.array([
+                any(username in author.lower() or username in email.lower() for username in unauthorized)
+                for author, email in commits.authors
+            ], dtype=bool)
+            unauthorized_mask = commits.author_mask(unauthorized_authors)
             
-            total_unauthorized_changes = sum(c.total_changes for c in unauthorized_commits)
+            total_unauthorized_changes = int(commits.total_changes[unauthorized_mask].sum())
             
             severity = "high" if total_unauthorized_changes > 100 else "medium"
             
@@ -150,45 +189,44 @@ class CommitAnalyzer:
                 evidence={
                     "unauthorized_contributors": list(unauthorized),
                     "team_members": [m.github_username for m in team.members],
-                    "unauthorized_commits": len(unauthorized_commits),
+                    "unauthorized_commits": int(unauthorized_mask.sum()),
                     "unauthorized_changes": total_unauthorized_changes
                 }
             ))
         
         return violations
     
-    def _check_large_initial_commits(self, repo_info: RepositoryInfo) -> List[Violation]:
+    def _check_large_initial_commits(self, commits: CommitColumns) -> List[Violation]:
         """Check for suspiciously large initial commits."""
         violations = []
         
-        if not repo_info.commits:
+        if not len(commits):
             return violations
         
-        sorted_commits = sorted(repo_info.commits, key=lambda x: x.timestamp)
-        initial_commits = sorted_commits
-        
-        for i, commit in enumerate(initial_commits):
-            if (commit.total_changes > self.analysis_config.large_commit_threshold or 
-                commit.files_changed > self.analysis_config.suspicious_file_count):
-                
-                severity = "high" if i == 0 else "medium" 
-                
-                violations.append(Violation(
-                    type=ViolationType.LARGE_INITIAL_COMMIT,
-                    severity=severity,
-                    description=f"Large initial commit #{i+1}: {commit.total_changes} changes, {commit.files_changed} files",
-                    evidence={
-                        "commit_sha": commit.sha,
-                        "commit_index": i,
-                        "timestamp": commit.timestamp.isoformat(),
-                        "total_changes": commit.total_changes,
-                        "additions": commit.additions,
-                        "deletions": commit.deletions,
-                        "files_changed": commit.files_changed,
-                        "message": commit.message,
-                        "threshold": self.analysis_config.large_commit_threshold
-                    }
-                ))
+        order = commits.order
+        large = ((commits.total_changes[order] > self.analysis_config.large_commit_threshold) |
+                 (commits.files_changed[order] > self.analysis_config.suspicious_file_count))
+        
+        for i in np.flatnonzero(large).tolist():
+            commit = commits.commits[order[i]]
+            severity = "high" if i == 0 else "medium" 
+            
+            violations.append(Violation(
+                type=ViolationType.LARGE_INITIAL_COMMIT,
+                severity=severity,
+                description=f"Large initial commit #{i+1}: {commit.total_changes} changes, {commit.files_changed} files",
+                evidence={
+                    "commit_sha": commit.sha,
+                    "commit_index": i,
+                    "timestamp": commit.timestamp.isoformat(),
+                    "total_changes": commit.total_changes,
+                    "additions": commit.additions,
+                    "deletions": commit.deletions,
+                    "files_changed": commit.files_changed,
+                    "message": commit.message,
+                    "threshold": self.analysis_config.large_commit_threshold
+                }
+            ))
         
         return violations
     
@@ -214,73 +252,142 @@ class CommitAnalyzer:
         
         return violations
     
-    def _check_code_reuse(self, team: Team, repo_info: RepositoryInfo) -> List[Violation]:
-        """Check for code reuse and plagiarism."""
+    def _check_code_reuse(self, team: Team, repo_info: RepositoryInfo) -> Tuple[List[Violation], List[CodeFileFingerprints]]:
+        """Check for code reuse and plagiarism.
+        
+        Also returns the fingerprints of files that did not match the
+        reference, for the cross-team comparison.
+        """
         violations = []
+        code_files = []
         
         try:
             repo_url_str = str(repo_info.url)
-            code_files = self.github_client.get_code_files(repo_url_str, max_files=30)
+            if self.git_backend:
+                fetched_files = self.git_backend.get_code_files(repo_url_str)
+            else:
+                # A tarball costs one request however many files it holds, so only
+                # the per-file contents mode needs a cap.
+                max_files = None if self.github_client.code_fetch_mode == "tarball" else 30
+                fetched_files = self.github_client.get_code_files(repo_url_str, max_files=max_files)
             
-            if not code_files:
-                return violations
+            if not fetched_files:
+                return violations, code_files
             
-            code_violations = self.code_comparison_engine.analyze_code_files(code_files, team.team_name)
+            code_violations = self.code_comparison_engine.analyze_code_files(fetched_files, team.team_name)
             violations.extend(code_violations)
-                
+            
+            if self.cross_team_enabled:
+                code_files = [
+                    CodeFileFingerprints(path=file_info['path'], fingerprints=sorted(file_info['fingerprints']))
+                    for file_info in fetched_files
+                    if file_info.get('fingerprints') and not file_info.get('reference_match')
+                ]
+        
         except Exception as e:
             logger.warning(f"Code reuse analysis failed: {e}")
         
-        return violations
+        return violations, code_files
+    
+    def apply_cross_team_matches(self, results: List[TeamAnalysisResult]) -> List[TeamAnalysisResult]:
+        """Recompute cross-team CODE_REUSE violations across all results.
+        
+        Cross-team violations already on a result (from a checkpoint or an
+        earlier incremental run) are replaced. Returns the results whose
+        violations changed, so the caller can persist them again.
+        """
+        if not self.cross_team_enabled:
+            return []
+        
+        detector = CrossTeamDetector(
+            threshold=self.analysis_config.cross_team_threshold,
+            high_threshold=self.analysis_config.similarity_high_threshold,
+            num_hashes=self.analysis_config.minhash_permutations,
+            bands=self.analysis_config.lsh_bands,
+            max_shared_teams=self.analysis_config.cross_team_max_shared_teams
+        )
+        for result in results:
+            detector.add_files(result.team, result.code_files)
+        cross_team_violations = detector.violations()
+        
+        changed = []
+        for result in results:
+            kept = [v for v in result.violations if v.evidence.get("match_type") != "cross_team"]
+            previous = [v for v in result.violations if v.evidence.get("match_type") == "cross_team"]
+            current = cross_team_violations.get(result.team.team_id, [])
+            if previous == current:
+                continue
+            result.violations = kept + current
+            result.is_flagged = any(v.severity == "high" for v in result.violations)
+            result.summary = self._generate_summary(result.team, result.violations)
+            changed.append(result)
+        
+        return changed
     
-    def _check_suspicious_patterns(self, repo_info: RepositoryInfo) -> List[Violation]:
+    def _check_suspicious_patterns(self, commits: CommitColumns) -> List[Violation]:
         """Check for suspicious commit patterns."""
         violations = []
         
-        if not repo_info.commits:
+        if not len(commits):
             return violations
         
-        violations.extend(self._check_rapid_commits(repo_info))
-        violations.extend(self._check_identical_timestamps(repo_info))
+        violations.extend(self._check_rapid_commits(commits))
+        violations.extend(self._check_identical_timestamps(commits))
         
         return violations
     
-    def _check_rapid_commits(self, repo_info: RepositoryInfo) -> List[Violation]:
-        """Check for suspiciously rapid commit patterns."""
+    def _check_rapid_commits(self, commits: CommitColumns) -> List[Violation]:
+        """Check for bursts of commits within any of the configured sliding windows."""
         violations = []
         
-        commit_windows = {}
-        for commit in repo_info.commits:
-            window = commit.timestamp.replace(second=0, microsecond=0)
-            if window not in commit_windows:
-                commit_windows[window] = []
-            commit_windows[window].append(commit)
-        
-        for window, commits in commit_windows.items():
-            if len(commits) > self.analysis_config.max_commits_per_minute:
-                total_changes = sum(c.total_changes for c in commits)
-                
-                violations.append(Violation(
-                    type=ViolationType.SUSPICIOUS_TIMING,
-                    severity="medium",
-                    description=f"Rapid commits: {len(commits)} commits in 1 minute at {window}",
-                    evidence={
-                        "timestamp": window.isoformat(),
-                        "commit_count": len(commits),
-                        "total_changes": total_changes,
-                        "threshold": self.analysis_config.max_commits_per_minute
-                    }
-                ))
+        # (first, last, window) per burst, positions in timestamp order.
+        bursts = []
+        for seconds, max_commits in self.analysis_config.rapid_commit_windows:
+            for first, last in commits.bursts(seconds * MICROSECONDS_PER_SECOND, max_commits + 1):
+                bursts.append((first, last, {"seconds": seconds, "max_commits": max_commits}))
+        bursts.sort(key=lambda burst: burst[0])
+        
+        # Bursts from different windows that share a commit become one interval.
+        merged = []
+        for first, last, window in bursts:
+            if merged and first <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], last)
+                if window not in merged[-1][2]:
+                    merged[-1][2].append(window)
+            else:
+                merged.append([first, last, [window]])
+        
+        order = commits.order
+        for first, last, windows in merged:
+            rows = order[first:last + 1]
+            start = commits.commits[rows[0]].timestamp
+            end = commits.commits[rows[-1]].timestamp
+            count = len(rows)
+            
+            violations.append(Violation(
+                type=ViolationType.SUSPICIOUS_TIMING,
+                severity="medium",
+                description=f"Rapid commits: {count} commits in {(end - start).total_seconds():.0f}s "
+                            f"from {start} to {end}",
+                evidence={
+                    "timestamp": start.isoformat(),
+                    "end_timestamp": end.isoformat(),
+                    "commit_count": count,
+                    "total_changes": int(commits.total_changes[rows].sum()),
+                    "windows": windows
+                }
+            ))
         
         return violations
     
-    def _check_identical_timestamps(self, repo_info: RepositoryInfo) -> List[Violation]:
+    def _check_identical_timestamps(self, commits: CommitColumns) -> List[Violation]:
         """Check for commits with identical timestamps."""
         violations = []
         
-        timestamp_counts = Counter(commit.timestamp for commit in repo_info.commits)
-        
-        identical_groups = [(ts, count) for ts, count in timestamp_counts.items() if count > 1]
+        identical_groups = [
+            (commits.commits[first_row].timestamp, count)
+            for first_row, count in commits.identical_timestamps()
+        ]
         
         if identical_groups:
             total_identical = sum(count for _, count in identical_groups)
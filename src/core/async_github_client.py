@@ -0,0 +1,196 @@
+"""
+Asyncio GitHub client that runs API calls concurrently.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .config import config
+from .github_client import GitHubClient
+from .models import CommitInfo, RepositoryInfo
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGitHubClient:
+    """Asyncio front end for GitHubClient with bounded request concurrency.
+    
+    Requests still go through the wrapped GitHubClient session (retries,
+    authentication), but run on a worker pool so independent calls overlap.
+    A semaphore caps the number of in-flight requests to stay inside
+    GitHub's secondary rate limits.
+    """
+    
+    def __init__(self, client: Optional[GitHubClient] = None, max_concurrency: Optional[int] = None):
+        self.client = client or GitHubClient()
+        self.max_concurrency = max_concurrency or config.github.max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="github"
+        )
+        self._semaphore = None
+        self._semaphore_loop = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False)
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the request semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking client call on the worker pool under the semaphore."""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    def parse_repo_url(self, repo_url: str) -> tuple[str, str]:
+        """Parse GitHub repository URL to extract owner and repo name."""
+        return self.client.parse_repo_url(repo_url)
+    
+    async def get_repository_info(self, repo_url: str) -> Dict:
+        """Get basic repository information."""
+        return await self._run(self.client.get_repository_info, repo_url)
+    
+    async def get_commits(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict]:
+        """Get commits from repository."""
+        return await self._run(self.client.get_commits, repo_url, since, until)
+    
+    async def get_contributors(self, repo_url: str) -> List[Dict]:
+        """Get repository contributors."""
+        return await self._run(self.client.get_contributors, repo_url)
+    
+    async def get_commit_details(self, repo_url: str, commit_sha: str) -> Dict:
+        """Get detailed commit information including files changed."""
+        return await self._run(self.client.get_commit_details, repo_url, commit_sha)
+    
+    async def get_repository_tree(self, repo_url: str) -> List[Dict]:
+        """Get complete file tree of repository."""
+        return await self._run(self.client.get_repository_tree, repo_url)
+    
+    async def get_file_content(self, repo_url: str, file_path: str) -> Dict:
+        """Get content of a specific file."""
+        return await self._run(self.client.get_file_content, repo_url, file_path)
+    
+    async def get_head_sha(self, repo_url: str) -> str:
+        """Get the SHA of the default branch head."""
+        return await self._run(self.client.get_head_sha, repo_url)
+    
+    async def analyze_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                 detail_window: Optional[Tuple[datetime, datetime]] = None,
+                                 previous: Optional[RepositoryInfo] = None) -> RepositoryInfo:
+        """Perform comprehensive repository analysis with concurrent fetches."""
+        logger.info(f"Analyzing repository: {repo_url}")
+        
+        incremental = bool(previous and previous.commits)
+        commits_since = self.client._incremental_since(previous, since) if incremental else since
+        repo_info, commits_raw, contributors_raw = await asyncio.gather(
+            self.get_repository_info(repo_url),
+            self.get_commits(repo_url, commits_since, until),
+            self.get_contributors(repo_url)
+        )
+        
+        known_commits = []
+        if incremental:
+            new_raw = self.client._new_commits(previous, commits_raw)
+            if new_raw is None:
+                logger.info(f"History of {repo_url} was rewritten, fetching it in full")
+                commits_raw = await self.get_commits(repo_url, since, until)
+            else:
+                logger.info(f"Found {len(new_raw)} new commits since the last run")
+                commits_raw = new_raw
+                known_commits = previous.commits
+        
+        indices = self.client._select_detail_indices(commits_raw, detail_window)
+        fetched = await asyncio.gather(*(
+            self._run(self.client._get_commit_details_safe, repo_url, commits_raw[i]['sha'])
+            for i in indices
+        ))
+        
+        commits = self.client._build_commits(commits_raw, dict(zip(indices, fetched))) + known_commits
+        return self.client._build_repository_info(repo_url, repo_info, commits, contributors_raw)
+    
+    async def stream_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                detail_window: Optional[Tuple[datetime, datetime]] = None
+                                ) -> Tuple[RepositoryInfo, Iterator[CommitInfo]]:
+        """Fetch repository metadata concurrently and return it with a lazy commit stream."""
+        logger.info(f"Streaming repository: {repo_url}")
+        repo_info, contributors_raw = await asyncio.gather(
+            self.get_repository_info(repo_url),
+            self.get_contributors(repo_url)
+        )
+        return (self.client._build_repository_info(repo_url, repo_info, [], contributors_raw),
+                self.client.iter_commits(repo_url, since, until, detail_window))
+    
+    async def analyze_repositories_graphql(self, repo_urls: List[str], since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, RepositoryInfo]:
+        """Fetch histories via GraphQL, running one batched query chain per chunk concurrently."""
+        batch_size = self.client.graphql_batch_size
+        chunks = [repo_urls[i:i + batch_size] for i in range(0, len(repo_urls), batch_size)]
+        
+        async def fetch_chunk(chunk):
+            try:
+                return await self._run(self.client.analyze_repositories_graphql, chunk, since, until)
+            except Exception as e:
+                logger.warning(f"GraphQL batch of {len(chunk)} repositories failed: {e}")
+                return {}
+        
+        results = {}
+        for chunk_results in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        return results
+    
+    async def _get_file_safe(self, repo_url: str, file_info: Dict) -> Optional[Dict]:
+        """Fetch and decode one code file, returning None on failure."""
+        stored = self.client.blob_store.get(file_info['sha'], file_info['path'])
+        if stored:
+            return stored
+        
+        try:
+            logger.info(f"  Fetching: {file_info['path']}")
+            content_data = await self.get_file_content(repo_url, file_info['path'])
+            return self.client._decode_file_content(file_info, content_data)
+        except Exception as e:
+            logger.warning(f"  Failed to fetch {file_info['path']}: {e}")
+            return None
+    
+    async def get_code_files_from_tarball(self, repo_url: str, max_files: Optional[int] = None) -> List[Dict]:
+        """Get code files by streaming the repository tarball in a single request."""
+        return await self._run(self.client.get_code_files_from_tarball, repo_url, max_files)
+    
+    async def get_code_files(self, repo_url: str, max_files: Optional[int] = 50, mode: Optional[str] = None) -> List[Dict]:
+        """Get contents of code files from repository concurrently."""
+        mode = mode or self.client.code_fetch_mode
+        if mode == "tarball":
+            return await self.get_code_files_from_tarball(repo_url, max_files)
+        
+        logger.info(f"Fetching code files from {repo_url}")
+        
+        try:
+            tree_data = await self.get_repository_tree(repo_url)
+            code_files = self.client._select_code_files(tree_data.get('tree', []), max_files)
+            
+            fetched = await asyncio.gather(*(
+                self._get_file_safe(repo_url, file_info) for file_info in code_files
+            ))
+            file_contents = [file_data for file_data in fetched if file_data]
+            
+            logger.info(f"Successfully fetched {len(file_contents)} code files")
+            return file_contents
+        
+        except Exception as e:
+            logger.error(f"Failed to fetch code files from {repo_url}: {e}")
+            return []
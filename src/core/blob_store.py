@@ -0,0 +1,128 @@
+"""
+Content-addressed store of fetched code files, shared by every team.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+BLOB_SHA_PATTERN = re.compile(r'[0-9a-f]{40}')
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Compute the git blob SHA-1 of raw file contents."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def load_boilerplate_blobs(path: str) -> Set[str]:
+    """Read an allow-list of boilerplate blob SHAs.
+    
+    Each line is either a 40-character git blob SHA or a file or directory,
+    relative to the list, whose files are hashed (for example a checkout of
+    the ``create-react-app`` template). Blank lines and ``#`` comments are
+    ignored.
+    """
+    allow_list = Path(path)
+    shas = set()
+    for line in allow_list.read_text(encoding='utf-8').splitlines():
+        entry = line.split('#', 1)[0].strip()
+        if not entry:
+            continue
+        if BLOB_SHA_PATTERN.fullmatch(entry.lower()):
+            shas.add(entry.lower())
+            continue
+        
+        target = allow_list.parent / entry
+        if target.is_dir():
+            files = [p for p in target.rglob('*') if p.is_file() and '.git' not in p.relative_to(target).parts]
+        elif target.is_file():
+            files = [target]
+        else:
+            logger.warning(f"Boilerplate list {allow_list} names missing path {entry}")
+            continue
+        shas.update(git_blob_sha(p.read_bytes()) for p in files)
+    
+    return shas
+
+
+class BlobStore:
+    """Decoded code files keyed by git blob SHA.
+    
+    Teams often commit identical files (framework boilerplate, vendored
+    libraries, license headers). When files are fetched one request at a
+    time, the first team to fetch a blob stores its decoded record and later
+    teams reuse it without a request. Records are evicted least recently
+    used once their contents exceed ``max_bytes``. Blobs on the boilerplate
+    allow-list are skipped entirely, so they are neither fetched nor compared.
+    """
+    
+    def __init__(self, boilerplate: Optional[Set[str]] = None, max_bytes: int = 64 * 1024 * 1024):
+        self.boilerplate = set(boilerplate or ())
+        self.max_bytes = max_bytes
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.skipped = 0
+    
+    @classmethod
+    def from_allow_list(cls, path: Optional[str], max_bytes: int = 64 * 1024 * 1024) -> "BlobStore":
+        """Create a store, loading the boilerplate allow-list if one is configured."""
+        if not path:
+            return cls(max_bytes=max_bytes)
+        try:
+            boilerplate = load_boilerplate_blobs(path)
+        except OSError as e:
+            logger.warning(f"Could not read boilerplate list {path}: {e}")
+            return cls(max_bytes=max_bytes)
+        logger.info(f"Loaded {len(boilerplate)} boilerplate blob SHAs from {path}")
+        return cls(boilerplate, max_bytes)
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    @property
+    def size(self) -> int:
+        """Total size of the stored file contents."""
+        return self._bytes
+    
+    def is_boilerplate(self, blob_sha: Optional[str]) -> bool:
+        """Whether a blob is on the allow-list; counts it as skipped if so."""
+        if blob_sha not in self.boilerplate:
+            return False
+        with self._lock:
+            self.skipped += 1
+        return True
+    
+    def get(self, blob_sha: Optional[str], path: str) -> Optional[Dict]:
+        """Stored record for a blob, relabelled with this team's path."""
+        if not blob_sha:
+            return None
+        with self._lock:
+            record = self._records.get(blob_sha)
+            if record is None:
+                return None
+            self._records.move_to_end(blob_sha)
+            self.hits += 1
+        return dict(record, path=path)
+    
+    def put(self, record: Dict) -> Dict:
+        """Store a decoded record under its blob SHA and return it."""
+        size = record['size']
+        if size > self.max_bytes:
+            return record
+        
+        with self._lock:
+            if record['sha'] in self._records:
+                return record
+            self._records[record['sha']] = {k: v for k, v in record.items() if k != 'path'}
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._records.popitem(last=False)
+                self._bytes -= evicted['size']
+        return record
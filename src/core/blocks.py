@@ -0,0 +1,215 @@
+"""
+Structural extraction of function and class blocks with line spans.
+"""
+import ast
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .tokenizer import (
+    C_FAMILY_IMPORTS, C_FAMILY_LEXER, HASH_COMMENT_EXTENSIONS, HASH_COMMENT_LEXER, NO_BLOCK_EXTENSIONS,
+    PYTHON_EXTENSIONS, file_extension
+)
+
+# Blocks shorter than this (stripped) are too generic to count as reuse.
+MIN_BLOCK_CHARS = 50
+
+CLASS_KEYWORDS = {'class', 'struct', 'interface', 'enum', 'impl', 'trait'}
+FUNCTION_KEYWORDS = {'function', 'func', 'fn', 'fun', 'def'}
+CONTROL_KEYWORDS = {
+    'if', 'else', 'for', 'foreach', 'while', 'do', 'switch', 'catch', 'try', 'finally', 'with',
+    'synchronized', 'using', 'lock', 'return', 'elif', 'unless'
+}
+
+# A header ending in one of these carries on to the next line.
+CONTINUATION_TOKENS = {
+    ',', '.', '=', '=>', '->', '::', ':', '?', '+', '-', '*', '/', '%', '&', '|', '&&', '||', '<', '>',
+    'extends', 'implements', 'new'
+}
+
+
+@dataclass
+class CodeBlock:
+    """A function or class unit of a source file."""
+    name: str
+    kind: str
+    start_line: int
+    end_line: int
+    text: str
+
+
+def extract_blocks(content: str, path: Optional[str] = None) -> List[CodeBlock]:
+    """Extract function and class blocks from a source file.
+    
+    Python files are parsed with ``ast``; other languages go through a
+    brace-matching pass over the C-family lexer. Methods are separate units,
+    and a class only becomes a unit of its own when it has no methods.
+    Nested functions stay part of their enclosing function. Stylesheets and
+    markup have no such units and yield no blocks.
+    """
+    extension = file_extension(path)
+    if extension in NO_BLOCK_EXTENSIONS:
+        return []
+    if extension in PYTHON_EXTENSIONS or not extension:
+        try:
+            return extract_python_blocks(content)
+        except (SyntaxError, ValueError):
+            if extension:
+                return []
+    return extract_brace_blocks(content, hash_comments=extension in HASH_COMMENT_EXTENSIONS)
+
+
+def _span_text(lines: List[str], start_line: int, end_line: int) -> str:
+    """Source text of a 1-based inclusive line span."""
+    return '\n'.join(lines[start_line - 1:end_line])
+
+
+def extract_python_blocks(content: str) -> List[CodeBlock]:
+    """Function, method and method-less class blocks of Python source."""
+    tree = ast.parse(content)
+    lines = content.split('\n')
+    blocks = []
+    
+    def visit(node: ast.AST):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start_line = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                is_class = isinstance(child, ast.ClassDef)
+                has_methods = is_class and any(
+                    isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) for item in child.body
+                )
+                if is_class:
+                    visit(child)
+                if not has_methods:
+                    text = _span_text(lines, start_line, child.end_lineno)
+                    if len(text.strip()) > MIN_BLOCK_CHARS:
+                        blocks.append(CodeBlock(
+                            name=child.name,
+                            kind="class" if is_class else "function",
+                            start_line=start_line,
+                            end_line=child.end_lineno,
+                            text=text
+                        ))
+            else:
+                visit(child)
+    
+    visit(tree)
+    return sorted(blocks, key=lambda b: b.start_line)
+
+
+def _classify_header(header: List[str]) -> Optional[tuple]:
+    """Return (kind, name) if the tokens before a '{' open a function or class."""
+    if not header:
+        return None
+    
+    for i, token in enumerate(header):
+        if token in CLASS_KEYWORDS:
+            # Go declares the name first: type T struct {
+            name = next((t for t in header[i + 1:] if t.isidentifier()), None)
+            if name is None:
+                name = next((t for t in reversed(header[:i]) if t.isidentifier() and t != 'type'), token)
+            return "class", name
+    
+    if header[0] in CONTROL_KEYWORDS or header[-1] in CONTROL_KEYWORDS:
+        return None
+    
+    for i, token in enumerate(header):
+        if token in FUNCTION_KEYWORDS:
+            rest = header[i + 1:]
+            if rest[:1] == ['(']:
+                # Go method receivers come before the name: func (r *T) Name(...)
+                rest = rest[rest.index(')') + 1:] if ')' in rest else []
+            name = rest[0] if rest and rest[0].isidentifier() else "<anonymous>"
+            return "function", name
+    
+    if header[-1] == '=>' or ('(' in header and ')' in header):
+        before_paren = header[:header.index('(')] if '(' in header else header[:-1]
+        identifiers = [t for t in before_paren if t.isidentifier() and t not in CONTROL_KEYWORDS]
+        if header[-1] != '=>' and not identifiers:
+            return None
+        return "function", identifiers[-1] if identifiers else "<anonymous>"
+    
+    return None
+
+
+def _continues_next_line(header: List[str]) -> bool:
+    """Whether a header cut at a newline is unfinished (open brackets or a trailing operator)."""
+    depth = sum(1 if t in ('(', '[') else -1 if t in (')', ']') else 0 for t in header)
+    return depth > 0 or header[-1] in CONTINUATION_TOKENS
+
+
+def extract_brace_blocks(content: str, hash_comments: bool = False) -> List[CodeBlock]:
+    """Function, method and method-less class blocks of brace-delimited source.
+    
+    A header runs from the end of the previous statement to the ``{``.
+    Statements end at ``;``, at braces, and at a newline that leaves the
+    header finished, so semicolon-free code (JavaScript, Go, Kotlin) does
+    not merge statements. A finished header is kept for one line in case
+    the brace sits on a line of its own.
+    """
+    lexer = HASH_COMMENT_LEXER if hash_comments else C_FAMILY_LEXER
+    lines = content.split('\n')
+    blocks = []
+    
+    # Open braces: (kind, name, start_line, contains_function) with kind None for plain blocks.
+    stack: List[list] = []
+    header: List[str] = []
+    header_line = 1
+    # Header finished by the last newline, used if the next token is '{'.
+    finished: Optional[tuple] = None
+    line = 1
+    for match in lexer.finditer(content):
+        kind = match.lastgroup
+        text = match.group()
+        
+        if kind in ('string', 'template'):
+            if not header:
+                header_line = line
+            header.append('STR')
+            finished = None
+        if kind == 'newline' and header:
+            if header[0] in C_FAMILY_IMPORTS:
+                # Semicolon-free package/import lines (Go, Kotlin) end at the newline.
+                header = []
+            elif not _continues_next_line(header):
+                finished = (header, header_line)
+                header = []
+        if kind in ('newline', 'comment', 'template', 'string', 'directive', 'hash_comment'):
+            line += text.count('\n')
+            continue
+        if kind == 'space':
+            continue
+        
+        if text == '{':
+            if not header and finished:
+                header, header_line = finished
+            classified = _classify_header(header)
+            inside_function = any(entry[0] == "function" for entry in stack)
+            if classified and not inside_function:
+                stack.append([classified[0], classified[1], header_line, False])
+            else:
+                stack.append([None, None, line, False])
+            header = []
+            finished = None
+        elif text == '}':
+            if stack:
+                block_kind, name, start_line, contains_function = stack.pop()
+                if block_kind == "function" and stack:
+                    stack[-1][3] = True
+                if block_kind == "function" or (block_kind == "class" and not contains_function):
+                    span = _span_text(lines, start_line, line)
+                    if len(span.strip()) > MIN_BLOCK_CHARS:
+                        blocks.append(CodeBlock(name, block_kind, start_line, line, span))
+                elif contains_function and stack:
+                    stack[-1][3] = True
+            header = []
+            finished = None
+        elif text == ';':
+            header = []
+            finished = None
+        else:
+            finished = None
+            if not header:
+                header_line = line
+            header.append(text)
+    
+    return sorted(blocks, key=lambda b: b.start_line)
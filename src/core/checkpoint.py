@@ -0,0 +1,69 @@
+"""
+Durable checkpoint store for long analysis runs.
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+from .models import TeamAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """Append-only JSONL log of completed team results.
+    
+    Each finished team is written as one line and fsynced immediately, so a
+    crash or rate-limit stall loses at most the team in flight. A truncated
+    last line from an interrupted write is ignored on load.
+    """
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+    
+    def load(self) -> Dict[str, TeamAnalysisResult]:
+        """Load completed results keyed by team_id."""
+        results = {}
+        if not self.path.exists():
+            return results
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    result = TeamAnalysisResult.model_validate_json(line)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable checkpoint line {line_number}: {e}")
+                    continue
+                results[result.team.team_id] = result
+        
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    # Terminate a partial last line so new records start cleanly.
+                    f.write(b'\n')
+        
+        logger.info(f"Loaded {len(results)} completed teams from checkpoint {self.path}")
+        return results
+    
+    def reset(self):
+        """Start a fresh checkpoint, discarding earlier results."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text('', encoding='utf-8')
+    
+    def append(self, result: TeamAnalysisResult):
+        """Durably record a completed team result."""
+        line = result.model_dump_json() + '\n'
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
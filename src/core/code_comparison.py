@@ -3,95 +3,342 @@ Code comparison system for detecting code reuse against reference files.
 """
 import hashlib
 import logging
-import re
-from typing import List, Dict
-from difflib import SequenceMatcher
+import multiprocessing
+import shutil
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import List, Dict, FrozenSet, Optional, Tuple
 from pathlib import Path
 
+from .blocks import CodeBlock, extract_blocks
+from .fingerprint import Fingerprint, fingerprint_set, fingerprint_tokens
+from .blob_store import git_blob_sha
 from .models import Violation, ViolationType
+from .reference_index import (
+    ReferenceFile, ReferenceIndex, ReferenceIndexBuilder, ReferenceMatch, collect_reference_paths, open_indexes,
+    save_indexes
+)
+from .tokenizer import file_extension, tokenize_code
 
 logger = logging.getLogger(__name__)
 
+# Bump when the tokenizer or block extraction changes so saved reference indexes are rebuilt.
+NORMALIZATION_VERSION = 3
+
+# Minimum fingerprint Jaccard similarity for a block to count as matching a reference block.
+BLOCK_MATCH_THRESHOLD = 0.7
+
+
+@dataclass
+class ReferenceResults:
+    """Everything a source matched in the reference indexes."""
+    matches: List[ReferenceMatch]
+    exact: Optional[ReferenceFile]
+    block_matches: List[Tuple[CodeBlock, ReferenceMatch]]
+
+
+@dataclass
+class PreparedSource:
+    """Normalized form of a source file or block, computed once per distinct content."""
+    size: int
+    file_hash: str
+    fingerprints: List[Fingerprint]
+    fingerprint_set: FrozenSet[int]
+    blocks: List[Tuple[CodeBlock, "PreparedSource"]] = field(default_factory=list)
+    # Filled on first comparison, so a blob shared by several teams is looked up once.
+    reference_results: Optional[ReferenceResults] = None
+
+
+# Engine of a comparison worker process, created once by _init_worker.
+_worker_engine: Optional["CodeComparisonEngine"] = None
+
+
+def _init_worker(engine_kwargs: Dict):
+    """Process pool initializer: open the shared reference index once per worker."""
+    global _worker_engine
+    _worker_engine = CodeComparisonEngine(**engine_kwargs)
+
+
+def _compare_chunk(files: List[Dict], team_name: str) -> List[Tuple[List[Violation], FrozenSet[int]]]:
+    """Compare a chunk of files inside a worker process."""
+    return [_worker_engine._compare_file(file_info, team_name) for file_info in files]
+
 
 class CodeComparisonEngine:
-    """Engine for detecting code reuse against a configurable reference file."""
+    """Engine for detecting code reuse against a configurable reference corpus.
+    
+    ``reference_file_path`` may name a single file, a directory of reference
+    code, or a ``.manifest`` listing files and directories. If ``index_path``
+    names an index saved by ``main.py build-index`` for the same source and
+    settings, it is memory-mapped instead of re-fingerprinting the corpus.
+    Reference blocks (functions and classes) are fingerprinted once into a
+    separate block index, so each submitted block is matched by lookup.
     
-    def __init__(self, reference_file_path: str, high_threshold: float = 0.8, medium_threshold: float = 0.6):
+    With ``workers`` > 0, files are scored in a process pool in chunks of
+    ``chunk_size``. Workers memory-map the same index file (an index built in
+    memory is first written to a temporary file), so it is loaded once per
+    worker and its pages are shared.
+    
+    Submitted files are prepared (tokenized, hashed, fingerprinted and split
+    into blocks) once per distinct git blob and kept in an LRU cache of
+    ``cache_size`` entries, so a file shared by several teams or seen again
+    is not normalized or compared twice.
+    """
+    
+    def __init__(self, reference_file_path: str, high_threshold: float = 0.8, medium_threshold: float = 0.6,
+                 kgram_size: int = 8, window_size: int = 4, top_matches: int = 3, index_path: Optional[str] = None,
+                 workers: int = 0, chunk_size: int = 16, cache_size: int = 4096):
         self.reference_file_path = reference_file_path
         self.high_threshold = high_threshold
         self.medium_threshold = medium_threshold
-        self.reference_content = ""
-        self.reference_hash = ""
+        self.kgram_size = kgram_size
+        self.window_size = window_size
+        self.top_matches = top_matches
+        self.index_path = index_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self._prepared: "OrderedDict[Tuple[str, str], PreparedSource]" = OrderedDict()
+        self._prepared_lock = threading.Lock()
+        self.reference_index = ReferenceIndexBuilder().build()
+        self.block_index = ReferenceIndexBuilder().build()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._shared_index_dir: Optional[str] = None
+        self._corpus_signature: Optional[str] = None
         self.load_reference_code()
     
+    def _index_params(self) -> Dict:
+        """Settings and corpus state a saved index must have been built with to be reused."""
+        if self._corpus_signature is None:
+            self._corpus_signature = self.corpus_signature()
+        return {
+            "source": str(Path(self.reference_file_path).resolve()),
+            "corpus": self._corpus_signature,
+            "kgram_size": self.kgram_size,
+            "window_size": self.window_size,
+            "normalization": NORMALIZATION_VERSION
+        }
+    
+    def corpus_signature(self) -> str:
+        """Digest of every reference file's path, size and modification time."""
+        digest = hashlib.sha256()
+        try:
+            paths = collect_reference_paths(self.reference_file_path)
+        except Exception:
+            return ""
+        for path in sorted(paths):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            digest.update(f"{path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+    
     def load_reference_code(self):
-        """Load reference code from the specified file."""
+        """Open the saved reference index, or fingerprint the corpus into a new one."""
+        if self.index_path and Path(self.index_path).exists():
+            try:
+                indexes = open_indexes(self.index_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable reference index {self.index_path}: {e}")
+            else:
+                index = indexes.get("files")
+                if index is not None and "blocks" in indexes and index.params == self._index_params():
+                    self.reference_index = index
+                    self.block_index = indexes["blocks"]
+                    logger.info(f"Opened reference index {self.index_path} ({len(index)} files, "
+                                f"{len(self.block_index)} blocks, {index.distinct_fingerprints} distinct fingerprints)")
+                    return
+                logger.warning(f"Reference index {self.index_path} was built for a different source, settings or "
+                               f"corpus contents - rebuilding in memory (run `main.py build-index` to refresh it)")
+        
+        self.reference_index, self.block_index = self.build_reference_index()
+    
+    def build_reference_index(self) -> Tuple[ReferenceIndex, ReferenceIndex]:
+        """Fingerprint every reference file and block into new corpus indexes."""
+        builder = ReferenceIndexBuilder(self._index_params())
+        block_builder = ReferenceIndexBuilder(self._index_params())
         try:
-            with open(self.reference_file_path, 'r', encoding='utf-8') as f:
-                self.reference_content = f.read()
-                self.reference_hash = self._calculate_file_hash(self.reference_content)
-            logger.info(f"Loaded reference code from {self.reference_file_path} ({len(self.reference_content)} chars)")
-        except FileNotFoundError:
-            logger.warning(f"Reference file {self.reference_file_path} not found - skipping code comparison")
-            self.reference_content = ""
+            paths = collect_reference_paths(self.reference_file_path)
         except Exception as e:
-            logger.error(f"Failed to load reference file {self.reference_file_path}: {e}")
-            self.reference_content = ""
+            logger.error(f"Failed to read reference source {self.reference_file_path}: {e}")
+            return builder.build(), block_builder.build()
+        
+        if not paths:
+            logger.warning(f"Reference source {self.reference_file_path} not found - skipping code comparison")
+            return builder.build(), block_builder.build()
+        
+        for path in paths:
+            try:
+                content = path.read_text(encoding='utf-8')
+            except Exception as e:
+                logger.warning(f"Skipping unreadable reference file {path}: {e}")
+                continue
+            prepared = self._prepare(content, str(path))
+            builder.add(str(path), prepared.size, prepared.fingerprints, prepared.file_hash)
+            
+            for block, prepared_block in prepared.blocks:
+                block_builder.add(str(path), prepared_block.size, prepared_block.fingerprints,
+                                  prepared_block.file_hash, block.start_line, block.end_line)
+        
+        index, block_index = builder.build(), block_builder.build()
+        logger.info(f"Indexed {len(index)} reference files and {len(block_index)} blocks from "
+                    f"{self.reference_file_path} ({index.distinct_fingerprints} distinct fingerprints)")
+        return index, block_index
+    
+    def save_reference_index(self, path: str):
+        """Write the file and block indexes to ``path`` for later runs and workers."""
+        save_indexes(path, {"files": self.reference_index, "blocks": self.block_index})
     
     def analyze_code_files(self, repo_files: List[Dict], team_name: str) -> List[Violation]:
-        """Analyze repository files against the configured reference file."""
+        """Analyze repository files against the reference corpus."""
         violations = []
         
-        if not repo_files or not self.reference_content:
+        if not repo_files or not len(self.reference_index):
             return violations
         
-        logger.info(f"Comparing {len(repo_files)} code files against reference {self.reference_file_path}")
+        logger.info(f"Comparing {len(repo_files)} code files against {len(self.reference_index)} reference files")
         
-        for file_info in repo_files:
-            file_violations = self._compare_against_reference(file_info, team_name)
+        if self.workers > 0:
+            chunks = [repo_files[i:i + self.chunk_size] for i in range(0, len(repo_files), self.chunk_size)]
+            results = [
+                result
+                for chunk_results in self._get_pool().map(_compare_chunk, chunks, repeat(team_name))
+                for result in chunk_results
+            ]
+        else:
+            results = [self._compare_file(file_info, team_name) for file_info in repo_files]
+        
+        for file_info, (file_violations, fingerprints) in zip(repo_files, results):
+            # Kept on the record so the cross-team pass does not fingerprint it
+            # again, and can leave out files that came from the reference.
+            file_info['fingerprints'] = fingerprints
+            file_info['reference_match'] = bool(file_violations)
             violations.extend(file_violations)
         
         return violations
     
-    def _compare_against_reference(self, file_info: Dict, team_name: str) -> List[Violation]:
-        """Compare a single file against the reference file."""
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the comparison process pool on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                index_path = self.index_path
+                if not self.reference_index.is_mapped:
+                    self._shared_index_dir = tempfile.mkdtemp(prefix="reference-index-")
+                    index_path = str(Path(self._shared_index_dir) / "reference_index.bin")
+                    self.save_reference_index(index_path)
+                
+                engine_kwargs = {
+                    "reference_file_path": self.reference_file_path,
+                    "high_threshold": self.high_threshold,
+                    "medium_threshold": self.medium_threshold,
+                    "kgram_size": self.kgram_size,
+                    "window_size": self.window_size,
+                    "top_matches": self.top_matches,
+                    "index_path": index_path,
+                    "cache_size": self.cache_size
+                }
+                # Spawned workers do not inherit the locks of the caller's threads.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(engine_kwargs,)
+                )
+                logger.info(f"Started {self.workers} code comparison worker processes")
+            return self._pool
+    
+    def close(self):
+        """Shut down the worker pool and remove any temporary shared index."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if self._shared_index_dir:
+                shutil.rmtree(self._shared_index_dir, ignore_errors=True)
+                self._shared_index_dir = None
+    
+    def _prepare(self, content: str, path: Optional[str], with_blocks: bool = True) -> PreparedSource:
+        """Tokenize, hash, fingerprint and (optionally) split a source into blocks."""
+        tokens = tokenize_code(content, path)
+        fingerprints = fingerprint_tokens(tokens, self.kgram_size, self.window_size)
+        blocks = [
+            (block, self._prepare(block.text, path, with_blocks=False))
+            for block in extract_blocks(content, path)
+        ] if with_blocks else []
+        return PreparedSource(
+            size=len(content),
+            file_hash=self._hash_tokens(tokens),
+            fingerprints=fingerprints,
+            fingerprint_set=frozenset(fingerprint_set(fingerprints)),
+            blocks=blocks
+        )
+    
+    def _prepare_cached(self, file_info: Dict) -> PreparedSource:
+        """Prepared form of a submitted file, from the LRU cache keyed by git blob SHA."""
+        path = file_info['path']
+        blob_sha = file_info.get('sha') or git_blob_sha(file_info['content'].encode('utf-8'))
+        # The same blob under another extension goes through a different lexer.
+        key = (blob_sha, file_extension(path))
+        
+        with self._prepared_lock:
+            prepared = self._prepared.get(key)
+            if prepared is not None:
+                self._prepared.move_to_end(key)
+                return prepared
+        
+        prepared = self._prepare(file_info['content'], path)
+        with self._prepared_lock:
+            self._prepared[key] = prepared
+            if len(self._prepared) > self.cache_size:
+                self._prepared.popitem(last=False)
+        return prepared
+    
+    def _compare_file(self, file_info: Dict, team_name: str) -> Tuple[List[Violation], FrozenSet[int]]:
+        """Compare one file and return its violations and fingerprint set."""
+        prepared = self._prepare_cached(file_info)
+        return self._compare_against_reference(file_info, team_name, prepared), prepared.fingerprint_set
+    
+    def _compare_against_reference(self, file_info: Dict, team_name: str, prepared: PreparedSource) -> List[Violation]:
+        """Compare a single file against its best-matching reference files."""
         violations = []
         file_path = file_info['path']
         content = file_info['content']
+        results = self._reference_results(prepared)
         
-        similarity = self._calculate_similarity(content, self.reference_content)
-        
-        if similarity > self.high_threshold:
-            violations.append(Violation(
-                type=ViolationType.CODE_REUSE,
-                severity="high",
-                description=f"High similarity ({similarity:.1%}) to reference code in {file_path}",
-                evidence={
-                    "file_path": file_path,
-                    "similarity_score": similarity,
-                    "reference_file": self.reference_file_path,
-                    "match_type": "high_similarity",
-                    "file_size": len(content),
-                    "reference_size": len(self.reference_content)
-                }
-            ))
-        elif similarity > self.medium_threshold:
+        for match in results.matches:
+            reference = self.reference_index.files[match.file_id]
+            if match.similarity > self.high_threshold:
+                severity, match_type, label = "high", "high_similarity", "High"
+            elif match.similarity > self.medium_threshold:
+                severity, match_type, label = "medium", "moderate_similarity", "Moderate"
+            else:
+                continue
+            
             violations.append(Violation(
                 type=ViolationType.CODE_REUSE,
-                severity="medium",
-                description=f"Moderate similarity ({similarity:.1%}) to reference code in {file_path}",
+                severity=severity,
+                description=f"{label} similarity ({match.similarity:.1%}) to reference code {match.path} in {file_path}",
                 evidence={
                     "file_path": file_path,
-                    "similarity_score": similarity,
-                    "reference_file": self.reference_file_path,
-                    "match_type": "moderate_similarity",
+                    "similarity_score": match.similarity,
+                    "containment": match.containment,
+                    "shared_fingerprints": match.shared,
+                    "reference_file": match.path,
+                    "reference_offset": match.reference_offset,
+                    "match_type": match_type,
                     "file_size": len(content),
-                    "reference_size": len(self.reference_content)
+                    "reference_size": reference.size
                 }
             ))
         
-        file_hash = self._calculate_file_hash(content)
-        if file_hash == self.reference_hash:
+        exact = results.exact
+        if exact:
             violations.append(Violation(
                 type=ViolationType.CODE_REUSE,
                 severity="high",
@@ -99,95 +346,65 @@ class CodeComparisonEngine:
                 evidence={
                     "file_path": file_path,
                     "match_type": "exact_copy",
-                    "file_hash": file_hash,
-                    "reference_file": self.reference_file_path
+                    "file_hash": prepared.file_hash,
+                    "reference_file": exact.path
                 }
             ))
         
-        block_matches = self._find_matching_code_blocks(content, self.reference_content)
-        if block_matches > 2:
+        block_matches = results.block_matches
+        if len(block_matches) > 2:
+            reference_files = Counter(match.path for _, match in block_matches)
             violations.append(Violation(
                 type=ViolationType.CODE_REUSE,
                 severity="medium",
-                description=f"Multiple code blocks ({block_matches}) match reference in {file_path}",
+                description=f"Multiple code blocks ({len(block_matches)}) match reference in {file_path}",
                 evidence={
                     "file_path": file_path,
-                    "matching_blocks": block_matches,
-                    "reference_file": self.reference_file_path,
+                    "matching_blocks": len(block_matches),
+                    "reference_file": reference_files.most_common(1)[0][0],
+                    "reference_files": sorted(reference_files),
+                    "blocks": [self._block_evidence(block, match) for block, match in block_matches],
                     "match_type": "code_blocks"
                 }
             ))
         
         return violations
     
-    def _calculate_similarity(self, content1: str, content2: str) -> float:
-        """Calculate similarity between two code files."""
-        norm1 = self._normalize_code(content1)
-        norm2 = self._normalize_code(content2)
-        
-        matcher = SequenceMatcher(None, norm1, norm2)
-        return matcher.ratio()
-    
-    def _normalize_code(self, content: str) -> str:
-        """Normalize code for comparison."""
-        content = re.sub(r'#.*?$', '', content, flags=re.MULTILINE)
-        content = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-        content = re.sub(r'""".*?"""', '', content, flags=re.DOTALL)
-        content = re.sub(r"'''.*?'''", '', content, flags=re.DOTALL)
-        
-        content = re.sub(r'\s+', ' ', content)
-        content = re.sub(r'^(import|from)\s+.*?$', '', content, flags=re.MULTILINE)
-        
-        return content.strip().lower()
-    
-    def _calculate_file_hash(self, content: str) -> str:
-        """Calculate SHA-256 hash of normalized file content."""
-        normalized = self._normalize_code(content)
-        return hashlib.sha256(normalized.encode()).hexdigest()
-    
-    def _find_matching_code_blocks(self, content: str, reference: str) -> int:
-        """Find number of matching code blocks between files."""
-        content_blocks = self._extract_code_blocks(content)
-        reference_blocks = self._extract_code_blocks(reference)
-        
-        matches = 0
-        for block1 in content_blocks:
-            for block2 in reference_blocks:
-                similarity = self._calculate_similarity(block1, block2)
-                if similarity > 0.7:
-                    matches += 1
-                    break
+    def _reference_results(self, prepared: PreparedSource) -> ReferenceResults:
+        """Look a prepared source up in the reference indexes, once per prepared source."""
+        if prepared.reference_results is None:
+            prepared.reference_results = ReferenceResults(
+                matches=self.reference_index.query(prepared.fingerprint_set, self.top_matches),
+                exact=self.reference_index.find_exact(prepared.file_hash),
+                block_matches=self._find_matching_code_blocks(prepared)
+            )
+        return prepared.reference_results
+    
+    def _hash_tokens(self, tokens: List[str]) -> str:
+        """SHA-256 of a normalized token stream."""
+        return hashlib.sha256(' '.join(tokens).encode()).hexdigest()
+    
+    def _find_matching_code_blocks(self, prepared: PreparedSource) -> List[Tuple[CodeBlock, ReferenceMatch]]:
+        """Pair every block that matches a reference block with its best match, via the block index."""
+        if not len(self.block_index):
+            return []
+        
+        matches = []
+        for block, prepared_block in prepared.blocks:
+            best = self.block_index.query(prepared_block.fingerprint_set, top_n=1)
+            if best and best[0].similarity > BLOCK_MATCH_THRESHOLD:
+                matches.append((block, best[0]))
         
         return matches
     
-    def _extract_code_blocks(self, content: str) -> List[str]:
-        """Extract logical code blocks from content."""
-        blocks = []
-        lines = content.split('\n')
-        current_block = []
-        in_function = False
-        indent_level = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            if stripped.startswith(('def ', 'class ', 'async def ')):
-                if current_block and in_function:
-                    blocks.append('\n'.join(current_block))
-                current_block = [line]
-                in_function = True
-                indent_level = len(line) - len(line.lstrip())
-            elif in_function:
-                line_indent = len(line) - len(line.lstrip())
-                if line_indent > indent_level or not stripped:
-                    current_block.append(line)
-                else:
-                    blocks.append('\n'.join(current_block))
-                    current_block = []
-                    in_function = False
-        
-        if current_block and in_function:
-            blocks.append('\n'.join(current_block))
-        
-        return [block for block in blocks if len(block.strip()) > 50] 
\ No newline at end of file
+    def _block_evidence(self, block: CodeBlock, match: ReferenceMatch) -> Dict:
+        """Line ranges of a submitted block and the reference block it matches."""
+        reference = self.block_index.files[match.file_id]
+        return {
+            "name": block.name,
+            "kind": block.kind,
+            "lines": [block.start_line, block.end_line],
+            "reference_file": reference.path,
+            "reference_lines": [reference.start_line, reference.end_line],
+            "similarity": match.similarity
+        }
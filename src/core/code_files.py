@@ -0,0 +1,21 @@
+"""
+Which repository files are code worth comparing.
+"""
+CODE_EXTENSIONS = {
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.h', 
+    '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala',
+    '.html', '.css', '.scss', '.less', '.vue', '.svelte'
+}
+
+SKIP_PATH_PARTS = ['node_modules', '__pycache__', '.git', 'dist', 'build']
+
+# The contents API refuses files above 1 MB; apply the same cap to archives and clones.
+MAX_CODE_FILE_SIZE = 1024 * 1024
+
+
+def is_code_path(file_path: str) -> bool:
+    """Check whether a repository path is a code file worth comparing."""
+    file_ext = '.' + file_path.split('.')[-1] if '.' in file_path else ''
+    if file_ext.lower() not in CODE_EXTENSIONS:
+        return False
+    return not any(skip in file_path.lower() for skip in SKIP_PATH_PARTS)
@@ -0,0 +1,79 @@
+"""
+Commit rules run by the analyzer's single pass over a repository's commits.
+"""
+from typing import TYPE_CHECKING, List
+
+from .commit_store import CommitColumns
+from .models import CommitInfo, RepositoryInfo, Team, Violation
+
+if TYPE_CHECKING:
+    from .analyzer import CommitAnalyzer
+
+
+class CommitRule:
+    """A check over one repository's commits.
+    
+    A fresh instance is created for every repository, so rules may keep
+    per-repository state. ``on_commit`` sees each commit once, in input
+    order, while the commit columns are being built; ``finalize`` runs once
+    after the last commit and returns the rule's violations. Adding a rule
+    adds no pass over the commits. The built-in rules only implement
+    ``finalize``; ``on_commit`` is for custom rules that want to act on
+    commits while a stream is still being fetched.
+    """
+    
+    def __init__(self, analyzer: "CommitAnalyzer", team: Team, repo_info: RepositoryInfo):
+        self.analyzer = analyzer
+        self.team = team
+        self.repo_info = repo_info
+    
+    def on_commit(self, row: int, commit: CommitInfo):
+        """Per-commit hook; the built-in rules work on the columns instead."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        """Violations found once every commit has been seen."""
+        return []
+
+
+class CommitTimingRule(CommitRule):
+    """Commits before the start or after the grace period."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        return self.analyzer._check_commit_timing(commits)
+
+
+class UnauthorizedContributorsRule(CommitRule):
+    """Contributors missing from the team roster."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        return self.analyzer._check_unauthorized_contributors(self.team, self.repo_info, commits)
+
+
+class LargeInitialCommitsRule(CommitRule):
+    """Commits above the size or file-count thresholds."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        return self.analyzer._check_large_initial_commits(commits)
+
+
+class ExcessiveContributorsRule(CommitRule):
+    """More contributors than the team size allows."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        return self.analyzer._check_excessive_contributors(self.team, self.repo_info)
+
+
+class SuspiciousPatternsRule(CommitRule):
+    """Rapid commits and identical timestamps."""
+    
+    def finalize(self, commits: CommitColumns) -> List[Violation]:
+        return self.analyzer._check_suspicious_patterns(commits)
+
+
+DEFAULT_RULES = [
+    CommitTimingRule,
+    UnauthorizedContributorsRule,
+    LargeInitialCommitsRule,
+    ExcessiveContributorsRule,
+    SuspiciousPatternsRule,
+]
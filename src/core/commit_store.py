@@ -0,0 +1,120 @@
+"""
+Columnar view of a repository's commits for vectorized checks.
+"""
+import calendar
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .models import CommitInfo
+
+MICROSECONDS_PER_SECOND = 1_000_000
+
+# Called with (row, commit) for every commit as it is ingested.
+CommitHook = Callable[[int, CommitInfo], None]
+
+
+def epoch_microseconds(timestamp: datetime) -> int:
+    """Exact epoch microseconds of a datetime (naive values are taken as UTC)."""
+    return calendar.timegm(timestamp.utctimetuple()) * 1_000_000 + timestamp.microsecond
+
+
+class CommitColumns:
+    """Commits of one repository as parallel NumPy arrays.
+    
+    Row ``i`` of every column describes ``commits[i]``, in the order the
+    backend returned them, so checks can select rows with boolean masks and
+    only touch the ``CommitInfo`` objects they report as evidence. Authors
+    are interned: ``author_ids`` indexes ``authors``, a list of distinct
+    (name, email) pairs.
+    
+    ``commits`` may be any iterable, including a generator that is still
+    paginating; it is consumed in a single pass, and each ``hooks`` callable
+    sees every commit as it arrives. Every commit is retained in
+    ``commits`` either way.
+    """
+    
+    def __init__(self, commits: Iterable[CommitInfo], hooks: Sequence[CommitHook] = ()):
+        self.commits: List[CommitInfo] = []
+        timestamps, additions, deletions, total_changes, files_changed, author_ids = [], [], [], [], [], []
+        author_index: Dict[Tuple[str, str], int] = {}
+        
+        for row, commit in enumerate(commits):
+            self.commits.append(commit)
+            timestamps.append(epoch_microseconds(commit.timestamp))
+            additions.append(commit.additions)
+            deletions.append(commit.deletions)
+            total_changes.append(commit.total_changes)
+            files_changed.append(commit.files_changed)
+            author_ids.append(author_index.setdefault((commit.author, commit.author_email), len(author_index)))
+            for hook in hooks:
+                hook(row, commit)
+        
+        self.timestamps = np.array(timestamps, dtype=np.int64)
+        self.additions = np.array(additions, dtype=np.int64)
+        self.deletions = np.array(deletions, dtype=np.int64)
+        self.total_changes = np.array(total_changes, dtype=np.int64)
+        self.files_changed = np.array(files_changed, dtype=np.int64)
+        self.author_ids = np.array(author_ids, dtype=np.int32)
+        self.authors: List[Tuple[str, str]] = list(author_index)
+        self._order = None
+    
+    def __len__(self) -> int:
+        return len(self.commits)
+    
+    @property
+    def order(self) -> np.ndarray:
+        """Row indices sorted by timestamp, ties kept in input order."""
+        if self._order is None:
+            self._order = np.argsort(self.timestamps, kind='stable')
+        return self._order
+    
+    def rows(self, indices: np.ndarray) -> List[CommitInfo]:
+        """The commits at the given row indices."""
+        return [self.commits[i] for i in indices.tolist()]
+    
+    def author_mask(self, matching_authors: np.ndarray) -> np.ndarray:
+        """Row mask from a boolean per distinct author."""
+        return matching_authors[self.author_ids]
+    
+    def bursts(self, window: int, min_commits: int) -> List[Tuple[int, int]]:
+        """Maximal runs of sorted positions where ``min_commits`` commits fall within ``window`` microseconds.
+        
+        Position ``k`` starts a burst when the ``min_commits``-th commit from
+        it is less than ``window`` after it (a vectorized two-pointer scan).
+        Bursts sharing a commit are merged. Returns inclusive (first, last)
+        positions into ``order``.
+        """
+        span = min_commits - 1
+        if len(self) < min_commits:
+            return []
+        
+        timestamps = self.timestamps[self.order]
+        starts = np.flatnonzero(timestamps[span:] - timestamps[:len(timestamps) - span] < window)
+        if not len(starts):
+            return []
+        
+        # A new burst begins where a start lies past the last commit of the previous one.
+        breaks = np.flatnonzero(starts[1:] > starts[:-1] + span) + 1
+        firsts = starts[np.concatenate(([0], breaks))]
+        lasts = starts[np.concatenate((breaks - 1, [len(starts) - 1]))] + span
+        return list(zip(firsts.tolist(), lasts.tolist()))
+    
+    def identical_timestamps(self, min_size: int = 2) -> List[Tuple[int, int]]:
+        """(first row, size) of every run of equal timestamps with at least ``min_size`` commits.
+        
+        Runs are read off the cached time order, so no second sort is needed.
+        They are returned in order of their first row, matching a dict built
+        by walking the commits.
+        """
+        if not len(self):
+            return []
+        timestamps = self.timestamps[self.order]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(timestamps)) + 1))
+        sizes = np.diff(np.append(starts, len(timestamps)))
+        selected = sizes >= min_size
+        # The sort is stable, so a run's first position holds its lowest row.
+        first_rows, sizes = self.order[starts[selected]], sizes[selected]
+        by_first_row = np.argsort(first_rows, kind='stable')
+        return list(zip(first_rows[by_first_row].tolist(), sizes[by_first_row].tolist()))
@@ -2,7 +2,7 @@
 Configuration management for hackathon review system.
 """
 import os
-from typing import Optional
+from typing import Optional, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -16,7 +16,20 @@ class GitHubConfig:
     base_url: str = "https://api.github.com"
     timeout: int = 30
     max_retries: int = 3
-    rate_limit_delay: float = 1.0
+    rate_limit_reserve: int = 50
+    rate_limit_pace_below: float = 0.2
+    max_concurrency: int = 8
+    cache_path: Optional[str] = ".cache/github_http.sqlite3"
+    code_fetch_mode: str = "tarball"
+    boilerplate_blobs_file: Optional[str] = None
+    blob_store_max_mb: int = 64
+    backend: str = "api"
+    clone_dir: str = ".cache/repos"
+    git_timeout: int = 600
+    graphql_batch_size: int = 10
+    commit_detail_policy: str = "all"
+    commit_detail_limit: int = 20
+    stream_commits: bool = False
 
 
 @dataclass
@@ -25,9 +38,25 @@ class AnalysisConfig:
     large_commit_threshold: int = 500 
     suspicious_file_count: int = 5
     max_commits_per_minute: int = 3
+    # (window seconds, max commits allowed within it) pairs for burst detection.
+    rapid_commit_windows: Tuple[Tuple[int, int], ...] = ((60, 3),)
     reference_code_file: Optional[str] = "main_test.py"
     similarity_high_threshold: float = 0.8
     similarity_medium_threshold: float = 0.6
+    fingerprint_k: int = 8
+    fingerprint_window: int = 4
+    reference_top_matches: int = 3
+    reference_index_file: Optional[str] = ".cache/reference_index.bin"
+    comparison_workers: int = 0
+    comparison_chunk_size: int = 16
+    comparison_cache_size: int = 4096
+    cross_team_enabled: bool = True
+    cross_team_threshold: float = 0.6
+    cross_team_max_shared_teams: int = 3
+    minhash_permutations: int = 128
+    lsh_bands: int = 32
+    state_dir: str = ".cache/state"
+    checkpoint_file: str = ".cache/analysis_checkpoint.jsonl"
 
 
 class ConfigManager:
@@ -44,18 +73,59 @@ class ConfigManager:
             base_url=os.getenv("GITHUB_BASE_URL", "https://api.github.com"),
             timeout=int(os.getenv("GITHUB_TIMEOUT", "30")),
             max_retries=int(os.getenv("GITHUB_MAX_RETRIES", "3")),
-            rate_limit_delay=float(os.getenv("GITHUB_RATE_LIMIT_DELAY", "1.0"))
+            rate_limit_reserve=int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "50")),
+            rate_limit_pace_below=float(os.getenv("GITHUB_RATE_LIMIT_PACE_BELOW", "0.2")),
+            max_concurrency=int(os.getenv("GITHUB_MAX_CONCURRENCY", "8")),
+            cache_path=os.getenv("GITHUB_CACHE_PATH", ".cache/github_http.sqlite3") or None,
+            code_fetch_mode=os.getenv("GITHUB_CODE_FETCH_MODE", "tarball"),
+            boilerplate_blobs_file=os.getenv("BOILERPLATE_BLOBS_FILE") or None,
+            blob_store_max_mb=int(os.getenv("BLOB_STORE_MAX_MB", "64")),
+            backend=os.getenv("REPOSITORY_BACKEND", "api"),
+            clone_dir=os.getenv("GIT_CLONE_DIR", ".cache/repos"),
+            git_timeout=int(os.getenv("GIT_TIMEOUT", "600")),
+            graphql_batch_size=int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", "10")),
+            commit_detail_policy=os.getenv("COMMIT_DETAIL_POLICY", "all"),
+            commit_detail_limit=int(os.getenv("COMMIT_DETAIL_LIMIT", "20")),
+            stream_commits=os.getenv("GITHUB_STREAM_COMMITS", "false").lower() == "true"
         )
     
+    def _parse_rapid_commit_windows(self, value: str, max_commits_per_minute: int) -> Tuple[Tuple[int, int], ...]:
+        """Parse "seconds:max_commits" pairs, defaulting to one minute at the per-minute limit."""
+        if not value.strip():
+            return ((60, max_commits_per_minute),)
+        windows = []
+        for pair in value.split(','):
+            seconds, max_commits = pair.split(':')
+            windows.append((int(seconds), int(max_commits)))
+        return tuple(windows)
+    
     def _load_analysis_config(self) -> AnalysisConfig:
         """Load analysis configuration from environment."""
+        max_commits_per_minute = int(os.getenv("MAX_COMMITS_PER_MINUTE", "3"))
         return AnalysisConfig(
             large_commit_threshold=int(os.getenv("LARGE_COMMIT_THRESHOLD", "500")),
             suspicious_file_count=int(os.getenv("SUSPICIOUS_FILE_COUNT", "5")),
-            max_commits_per_minute=int(os.getenv("MAX_COMMITS_PER_MINUTE", "3")),
+            max_commits_per_minute=max_commits_per_minute,
+            rapid_commit_windows=self._parse_rapid_commit_windows(
+                os.getenv("RAPID_COMMIT_WINDOWS", ""), max_commits_per_minute
+            ),
             reference_code_file=os.getenv("REFERENCE_CODE_FILE", "main_test.py"),
             similarity_high_threshold=float(os.getenv("SIMILARITY_HIGH_THRESHOLD", "0.8")),
-            similarity_medium_threshold=float(os.getenv("SIMILARITY_MEDIUM_THRESHOLD", "0.6"))
+            similarity_medium_threshold=float(os.getenv("SIMILARITY_MEDIUM_THRESHOLD", "0.6")),
+            fingerprint_k=int(os.getenv("FINGERPRINT_K", "8")),
+            fingerprint_window=int(os.getenv("FINGERPRINT_WINDOW", "4")),
+            reference_top_matches=int(os.getenv("REFERENCE_TOP_MATCHES", "3")),
+            reference_index_file=os.getenv("REFERENCE_INDEX_FILE", ".cache/reference_index.bin") or None,
+            comparison_workers=int(os.getenv("COMPARISON_WORKERS", "0")),
+            comparison_chunk_size=int(os.getenv("COMPARISON_CHUNK_SIZE", "16")),
+            comparison_cache_size=int(os.getenv("COMPARISON_CACHE_SIZE", "4096")),
+            cross_team_enabled=os.getenv("CROSS_TEAM_ENABLED", "true").lower() == "true",
+            cross_team_threshold=float(os.getenv("CROSS_TEAM_THRESHOLD", "0.6")),
+            cross_team_max_shared_teams=int(os.getenv("CROSS_TEAM_MAX_SHARED_TEAMS", "3")),
+            minhash_permutations=int(os.getenv("MINHASH_PERMUTATIONS", "128")),
+            lsh_bands=int(os.getenv("LSH_BANDS", "32")),
+            state_dir=os.getenv("STATE_DIR", ".cache/state"),
+            checkpoint_file=os.getenv("CHECKPOINT_FILE", ".cache/analysis_checkpoint.jsonl")
         )
     
     def validate(self) -> list:
@@ -74,6 +144,48 @@ class ConfigManager:
         if self.analysis.max_commits_per_minute <= 0:
             errors.append("Max commits per minute must be positive")
         
+        if any(seconds <= 0 or max_commits <= 0 for seconds, max_commits in self.analysis.rapid_commit_windows):
+            errors.append("Rapid commit windows must have positive durations and commit limits")
+        
+        if not 0 <= self.github.rate_limit_pace_below <= 1:
+            errors.append("Rate-limit pacing threshold must be between 0 and 1")
+        
+        if self.github.code_fetch_mode not in ("tarball", "contents"):
+            errors.append("GitHub code fetch mode must be 'tarball' or 'contents'")
+        
+        if self.github.blob_store_max_mb < 0:
+            errors.append("Blob store size must be non-negative")
+        
+        if self.github.backend not in ("api", "git", "graphql"):
+            errors.append("Repository backend must be 'api', 'git' or 'graphql'")
+        
+        if self.github.commit_detail_policy not in ("all", "recent", "edges", "window"):
+            errors.append("Commit detail policy must be 'all', 'recent', 'edges' or 'window'")
+        
+        if self.github.graphql_batch_size <= 0:
+            errors.append("GraphQL batch size must be positive")
+        
+        if self.analysis.fingerprint_k <= 0 or self.analysis.fingerprint_window <= 0:
+            errors.append("Fingerprint k-gram size and window must be positive")
+        
+        if self.analysis.reference_top_matches <= 0:
+            errors.append("Reference top matches must be positive")
+        
+        if self.analysis.comparison_workers < 0 or self.analysis.comparison_chunk_size <= 0:
+            errors.append("Comparison workers must be non-negative and the chunk size positive")
+        
+        if self.analysis.comparison_cache_size < 0:
+            errors.append("Comparison cache size must be non-negative")
+        
+        permutations = self.analysis.minhash_permutations
+        if permutations <= 0 or permutations & (permutations - 1):
+            errors.append("MinHash permutations must be a power of two")
+        elif self.analysis.lsh_bands <= 0 or permutations % self.analysis.lsh_bands:
+            errors.append("LSH bands must evenly divide the MinHash permutations")
+        
+        if self.github.max_concurrency <= 0:
+            errors.append("GitHub max concurrency must be positive")
+        
         return errors
 
 
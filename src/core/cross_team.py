@@ -0,0 +1,204 @@
+"""
+Cross-team plagiarism detection with MinHash locality-sensitive hashing.
+"""
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .models import CodeFileFingerprints, Team, Violation, ViolationType
+
+logger = logging.getLogger(__name__)
+
+MASK_64 = (1 << 64) - 1
+
+# Files this small share fingerprints by accident (empty modules, one-line configs).
+MIN_FINGERPRINTS = 8
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer, so bin choice does not depend on fingerprint low bits."""
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK_64
+    return value ^ (value >> 31)
+
+
+def minhash_signature(fingerprints: Iterable[int], num_hashes: int) -> Optional[List[int]]:
+    """One-permutation MinHash signature of a fingerprint set.
+    
+    Each fingerprint is hashed once and assigned to one of ``num_hashes``
+    bins, keeping the minimum per bin, so the cost is linear in the set
+    size rather than ``num_hashes`` times it. Empty bins borrow the value of
+    the next non-empty bin to the right (rotation densification), offset by
+    the distance so borrowed values never collide with real ones.
+    """
+    bits = num_hashes.bit_length() - 1
+    bins: List[Optional[int]] = [None] * num_hashes
+    for value in fingerprints:
+        mixed = _mix64(value)
+        index = mixed & (num_hashes - 1)
+        rest = mixed >> bits
+        if bins[index] is None or rest < bins[index]:
+            bins[index] = rest
+    
+    if all(value is None for value in bins):
+        return None
+    
+    signature = list(bins)
+    following = None
+    distance = 0
+    # Two passes from the right wrap the rotation around the end.
+    for i in reversed(range(2 * num_hashes)):
+        index = i % num_hashes
+        if bins[index] is not None:
+            following = bins[index]
+            distance = 0
+        else:
+            distance += 1
+            if following is not None and i < num_hashes:
+                signature[index] = following + distance * (1 << 64)
+    
+    return signature
+
+
+@dataclass
+class SubmittedFile:
+    """A fetched team file registered for cross-team comparison."""
+    team_id: str
+    team_name: str
+    path: str
+    fingerprints: FrozenSet[int]
+
+
+@dataclass
+class CrossTeamMatch:
+    """A verified pair of similar files from two different teams."""
+    first: SubmittedFile
+    second: SubmittedFile
+    similarity: float
+
+
+class CrossTeamDetector:
+    """Finds files copied between teams without comparing every pair.
+    
+    Every file's MinHash signature is split into ``bands`` bands; files that
+    agree on a whole band land in the same bucket and become candidates.
+    Candidates are then verified with the exact Jaccard similarity of their
+    fingerprint sets. With the defaults (128 hashes, 32 bands of 4) pairs
+    above roughly 0.42 similarity are very likely to become candidates.
+    
+    Boilerplate is left out before bucketing: fingerprints found in more
+    than ``max_shared_teams`` teams (stock scaffolding, vendored libraries,
+    license headers) are dropped from every file. Files that matched the
+    reference corpus are never recorded for comparison.
+    """
+    
+    def __init__(self, threshold: float = 0.6, high_threshold: float = 0.8,
+                 num_hashes: int = 128, bands: int = 32, max_shared_teams: int = 3):
+        if num_hashes & (num_hashes - 1) or num_hashes % bands:
+            raise ValueError("MinHash size must be a power of two divisible by the band count")
+        
+        self.threshold = threshold
+        self.high_threshold = high_threshold
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.max_shared_teams = max_shared_teams
+        self.files: List[SubmittedFile] = []
+        self._lock = threading.Lock()
+    
+    def add_files(self, team: Team, code_files: Iterable[CodeFileFingerprints]):
+        """Register a team's code files."""
+        entries = []
+        for code_file in code_files:
+            fingerprints = frozenset(code_file.fingerprints)
+            if len(fingerprints) < MIN_FINGERPRINTS:
+                continue
+            entries.append(SubmittedFile(team.team_id, team.team_name, code_file.path, fingerprints))
+        
+        with self._lock:
+            self.files.extend(entries)
+    
+    def common_fingerprints(self) -> Set[int]:
+        """Fingerprints present in the files of more than ``max_shared_teams`` teams."""
+        per_team: Dict[str, Set[int]] = {}
+        for submitted in self.files:
+            per_team.setdefault(submitted.team_id, set()).update(submitted.fingerprints)
+        team_counts = Counter(value for fingerprints in per_team.values() for value in fingerprints)
+        return {value for value, count in team_counts.items() if count > self.max_shared_teams}
+    
+    def _distinctive_files(self) -> List[SubmittedFile]:
+        """Registered files with common fingerprints removed, dropping those left too small."""
+        common = self.common_fingerprints()
+        if not common:
+            return list(self.files)
+        
+        distinctive = []
+        for submitted in self.files:
+            fingerprints = submitted.fingerprints - common
+            if len(fingerprints) >= MIN_FINGERPRINTS:
+                distinctive.append(SubmittedFile(submitted.team_id, submitted.team_name, submitted.path, fingerprints))
+        logger.info(f"Cross-team comparison: ignoring {len(common)} fingerprints shared by more than "
+                    f"{self.max_shared_teams} teams, {len(self.files) - len(distinctive)} files left out")
+        return distinctive
+    
+    def candidate_pairs(self, files: List[SubmittedFile]) -> Set[Tuple[int, int]]:
+        """Index pairs of ``files`` from different teams that share at least one band."""
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for file_id, submitted in enumerate(files):
+            signature = minhash_signature(submitted.fingerprints, self.num_hashes)
+            for band in range(self.bands):
+                key = hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+                buckets.setdefault((band, key), []).append(file_id)
+        
+        pairs = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if files[first].team_id != files[second].team_id:
+                        pairs.add((first, second))
+        return pairs
+    
+    def find_matches(self) -> List[CrossTeamMatch]:
+        """Verify candidate pairs and return those above the threshold."""
+        files = self._distinctive_files()
+        candidates = self.candidate_pairs(files)
+        matches = []
+        for first, second in candidates:
+            a = files[first].fingerprints
+            b = files[second].fingerprints
+            shared = len(a & b)
+            similarity = shared / (len(a) + len(b) - shared)
+            if similarity > self.threshold:
+                matches.append(CrossTeamMatch(files[first], files[second], similarity))
+        
+        logger.info(f"Cross-team comparison: {len(files)} files, {len(candidates)} candidate pairs, "
+                    f"{len(matches)} matches")
+        return sorted(matches, key=lambda m: -m.similarity)
+    
+    def violations(self) -> Dict[str, List[Violation]]:
+        """CODE_REUSE violations for every verified match, keyed by team_id."""
+        violations: Dict[str, List[Violation]] = {}
+        for match in self.find_matches():
+            severity = "high" if match.similarity > self.high_threshold else "medium"
+            teams = sorted([match.first.team_name, match.second.team_name])
+            for own, other in ((match.first, match.second), (match.second, match.first)):
+                violations.setdefault(own.team_id, []).append(Violation(
+                    type=ViolationType.CODE_REUSE,
+                    severity=severity,
+                    description=f"{own.path} matches {other.path} from team '{other.team_name}' "
+                                f"({match.similarity:.1%} similarity)",
+                    evidence={
+                        "file_path": own.path,
+                        "similarity_score": match.similarity,
+                        "other_team_id": other.team_id,
+                        "other_team_name": other.team_name,
+                        "other_file_path": other.path,
+                        "teams": teams,
+                        "match_type": "cross_team"
+                    }
+                ))
+        return violations
@@ -0,0 +1,88 @@
+"""
+Winnowing fingerprints for linear-time code similarity.
+"""
+import hashlib
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Set, Tuple
+
+MASK_64 = (1 << 64) - 1
+ROLLING_BASE = 1000003
+
+Fingerprint = Tuple[int, int]
+
+
+@lru_cache(maxsize=65536)
+def token_hash(token: str) -> int:
+    """Stable 64-bit hash of a token (independent of PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+
+
+def kgram_hashes(tokens: Sequence[str], k: int) -> List[int]:
+    """Rolling polynomial hashes of every k-token window, in O(n)."""
+    if len(tokens) < k:
+        return []
+    
+    values = [token_hash(token) for token in tokens]
+    high = pow(ROLLING_BASE, k - 1, 1 << 64)
+    
+    current = 0
+    for value in values[:k]:
+        current = (current * ROLLING_BASE + value) & MASK_64
+    hashes = [current]
+    
+    for i in range(k, len(values)):
+        current = ((current - values[i - k] * high) * ROLLING_BASE + values[i]) & MASK_64
+        hashes.append(current)
+    
+    return hashes
+
+
+def winnow(hashes: Sequence[int], window: int) -> List[Fingerprint]:
+    """Select the minimum hash of every window of ``window`` k-gram hashes.
+    
+    Uses a monotonic deque, so the whole pass is O(n). Ties pick the
+    rightmost minimum, and a position is recorded only once, as in the
+    robust winnowing of Schleimer et al. Returns (hash, k-gram position) pairs.
+    """
+    if not hashes:
+        return []
+    if len(hashes) <= window:
+        position = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [(hashes[position], position)]
+    
+    fingerprints: List[Fingerprint] = []
+    candidates: deque = deque()
+    last_selected = -1
+    
+    for i, value in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        
+        if i >= window - 1 and candidates[0] != last_selected:
+            last_selected = candidates[0]
+            fingerprints.append((hashes[last_selected], last_selected))
+    
+    return fingerprints
+
+
+def fingerprint_tokens(tokens: Sequence[str], k: int = 8, window: int = 4) -> List[Fingerprint]:
+    """Winnowed fingerprints of a token stream.
+    
+    Streams shorter than ``k`` tokens get a single fingerprint over all of
+    their tokens so tiny snippets still compare.
+    """
+    if not tokens:
+        return []
+    if len(tokens) < k:
+        return [(kgram_hashes(tokens, len(tokens))[0], 0)]
+    return winnow(kgram_hashes(tokens, k), window)
+
+
+def fingerprint_set(fingerprints: Iterable[Fingerprint]) -> Set[int]:
+    """Distinct hashes of a fingerprint list."""
+    return {value for value, _ in fingerprints}
@@ -0,0 +1,260 @@
+"""
+Local git clone backend for repository analysis.
+"""
+import hashlib
+import logging
+import os
+import re
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from .code_files import MAX_CODE_FILE_SIZE, is_code_path
+from .config import config
+from .models import RepositoryInfo, CommitInfo
+
+logger = logging.getLogger(__name__)
+
+# One record per commit: RS, then header fields separated by US, then numstat lines.
+RECORD_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+LOG_FORMAT = "%x1e%H%x1f%an%x1f%ae%x1f%aI%x1f%B%x1f"
+
+NOREPLY_EMAIL = re.compile(r'^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$', re.IGNORECASE)
+
+
+class GitBackendError(Exception):
+    """Raised when a git command fails."""
+    pass
+
+
+class LocalGitBackend:
+    """Builds RepositoryInfo from a local clone with a single `git log --numstat` pass.
+    
+    Unlike the REST path, every commit gets real additions/deletions/files
+    changed, and code files are read from the same clone instead of the API.
+    Clones are bare and kept under ``clone_dir`` so later runs only fetch new
+    objects. ``file://`` URLs and plain paths work offline.
+    """
+    
+    def __init__(self, clone_dir: Optional[str] = None, github_client=None):
+        self.clone_dir = Path(clone_dir or config.github.clone_dir)
+        self.github_client = github_client
+        self.token = config.github.token
+        self.timeout = config.github.git_timeout
+    
+    def _git(self, *args: str, cwd: Optional[Path] = None, remote: Optional[str] = None) -> str:
+        """Run a git command and return its decoded stdout.
+        
+        The token is only sent when ``remote`` is a GitHub URL, and only
+        through the environment so it never appears in the process list.
+        """
+        return self._git_bytes(*args, cwd=cwd, remote=remote).decode('utf-8', errors='replace')
+    
+    def _git_bytes(self, *args: str, cwd: Optional[Path] = None, remote: Optional[str] = None,
+                   input: Optional[bytes] = None) -> bytes:
+        """Run a git command and return its raw stdout."""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if remote and self.token and self._is_github_url(remote):
+            parsed = urlparse(remote)
+            # Appended after any config entries the caller's environment already sets.
+            index = int(env.get("GIT_CONFIG_COUNT", "0"))
+            env["GIT_CONFIG_COUNT"] = str(index + 1)
+            env[f"GIT_CONFIG_KEY_{index}"] = f"http.{parsed.scheme}://{parsed.hostname}/.extraHeader"
+            env[f"GIT_CONFIG_VALUE_{index}"] = f"Authorization: Bearer {self.token}"
+        
+        try:
+            result = subprocess.run(["git", *args], cwd=cwd, env=env, input=input, capture_output=True,
+                                    timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise GitBackendError(f"git {args[0]} timed out after {self.timeout}s")
+        if result.returncode != 0:
+            stderr = result.stderr.decode('utf-8', errors='replace').strip()
+            raise GitBackendError(f"git {args[0]} failed: {stderr}")
+        return result.stdout
+    
+    def _is_github_url(self, repo_url: str) -> bool:
+        """Check whether the URL points at github.com."""
+        return urlparse(repo_url).hostname in ("github.com", "www.github.com")
+    
+    def _remote(self, repo_url: str) -> str:
+        """URL git should fetch from; plain paths become ``file://`` URLs."""
+        # Shallow clones only work through a transport, so use file:// for paths.
+        return repo_url if urlparse(repo_url).scheme else Path(repo_url).resolve().as_uri()
+    
+    def _clone_path(self, repo_url: str) -> Path:
+        """Directory of the cached bare clone for a repository URL."""
+        remote = self._remote(repo_url)
+        parts = [p for p in urlparse(remote).path.strip('/').split('/') if p]
+        name = parts[-1] if parts else "repo"
+        if name.endswith('.git'):
+            name = name[:-4]
+        # Keyed by the remote, so a path and its file:// URL share one clone.
+        digest = hashlib.sha1(remote.encode()).hexdigest()[:12]
+        return self.clone_dir / f"{name}-{digest}.git"
+    
+    def sync(self, repo_url: str, since: Optional[datetime] = None) -> Path:
+        """Clone the repository, or fetch new commits into an existing clone."""
+        path = self._clone_path(repo_url)
+        remote = self._remote(repo_url)
+        shallow = [f"--shallow-since={since.isoformat()}"] if since else []
+        
+        if (path / "HEAD").exists():
+            logger.info(f"Fetching new commits for {repo_url}")
+            if not (path / "shallow").exists():
+                # Never truncate a clone that already has full history.
+                shallow = []
+            self._git("fetch", "--prune", *shallow, "origin", "+refs/heads/*:refs/heads/*", cwd=path, remote=repo_url)
+        else:
+            logger.info(f"Cloning {repo_url} into {path}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._git("clone", "--bare", *shallow, remote, str(path), remote=repo_url)
+        
+        return path
+    
+    def get_head_sha(self, repo_url: str) -> str:
+        """Get the SHA of the remote HEAD without fetching any objects."""
+        output = self._git("ls-remote", self._remote(repo_url), "HEAD", remote=repo_url)
+        if not output.strip():
+            raise GitBackendError(f"Repository has no HEAD: {repo_url}")
+        return output.split()[0]
+    
+    def get_commits(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[CommitInfo]:
+        """Get every commit with full stats from a single git log pass."""
+        path = self.sync(repo_url, since)
+        
+        args = ["log", "HEAD", "--numstat", "--diff-merges=first-parent", f"--format={LOG_FORMAT}"]
+        if since:
+            args.append(f"--since={since.isoformat()}")
+        if until:
+            args.append(f"--until={until.isoformat()}")
+        
+        return self.parse_log(self._git(*args, cwd=path))
+    
+    def get_code_files(self, repo_url: str, max_files: Optional[int] = None) -> List[Dict]:
+        """Read the code files at HEAD from the local clone.
+        
+        Uses the clone left by ``analyze_repository``, cloning only if there
+        is none, and applies the same path, size and boilerplate filters as
+        the API. Returns records shaped like ``GitHubClient.get_code_files``.
+        """
+        path = self._clone_path(repo_url)
+        if not (path / "HEAD").exists():
+            path = self.sync(repo_url)
+        
+        selected = []
+        for entry in self._git_bytes("ls-tree", "-r", "-l", "-z", "HEAD", cwd=path).split(b"\0"):
+            if not entry:
+                continue
+            info, file_path = entry.split(b"\t", 1)
+            _, object_type, blob_sha, size = info.decode().split()
+            file_path = file_path.decode('utf-8', errors='replace')
+            if object_type != "blob" or not is_code_path(file_path) or int(size) > MAX_CODE_FILE_SIZE:
+                continue
+            if self.github_client and self.github_client.blob_store.is_boilerplate(blob_sha):
+                continue
+            selected.append((file_path, blob_sha))
+            if max_files and len(selected) >= max_files:
+                break
+        
+        if not selected:
+            return []
+        
+        # One cat-file process streams every blob: "<sha> blob <size>\n<data>\n" each.
+        output = self._git_bytes("cat-file", "--batch", cwd=path,
+                                 input=b"".join(sha.encode() + b"\n" for _, sha in selected))
+        code_files = []
+        offset = 0
+        for file_path, blob_sha in selected:
+            header_end = output.index(b"\n", offset)
+            size = int(output[offset:header_end].split()[2])
+            data = output[header_end + 1:header_end + 1 + size]
+            offset = header_end + 1 + size + 1
+            
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                logger.warning(f"  Skipping binary file: {file_path}")
+                continue
+            code_files.append({
+                'path': file_path,
+                'content': content,
+                'size': len(content),
+                'sha': blob_sha,
+                'lines': len(content.split('\n'))
+            })
+        
+        logger.info(f"Read {len(code_files)} code files from the local clone of {repo_url}")
+        return code_files
+    
+    def parse_log(self, output: str) -> List[CommitInfo]:
+        """Parse `git log --numstat` output produced with LOG_FORMAT."""
+        commits = []
+        for record in output.split(RECORD_SEPARATOR):
+            if not record.strip():
+                continue
+            
+            sha, author, email, date, message, numstat = record.split(FIELD_SEPARATOR, 5)
+            
+            additions = deletions = files_changed = 0
+            for line in numstat.splitlines():
+                parts = line.split('\t', 2)
+                if len(parts) != 3:
+                    continue
+                files_changed += 1
+                # Binary files report "-" for both counts.
+                if parts[0].isdigit():
+                    additions += int(parts[0])
+                if parts[1].isdigit():
+                    deletions += int(parts[1])
+            
+            commits.append(CommitInfo(
+                sha=sha,
+                author=author,
+                author_email=email,
+                timestamp=datetime.fromisoformat(date),
+                message=message.strip(),
+                additions=additions,
+                deletions=deletions,
+                total_changes=additions + deletions,
+                files_changed=files_changed
+            ))
+        
+        return commits
+    
+    def _contributor_login(self, commit: CommitInfo) -> str:
+        """Best-effort GitHub login for a commit author."""
+        match = NOREPLY_EMAIL.match(commit.author_email)
+        return match.group(1) if match else commit.author
+    
+    def analyze_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> RepositoryInfo:
+        """Perform comprehensive repository analysis from a local clone."""
+        logger.info(f"Analyzing repository (git): {repo_url}")
+        
+        commits = self.get_commits(repo_url, since, until)
+        
+        if self.github_client and self._is_github_url(repo_url):
+            # Logins and creation date are not in git history; two cached API calls.
+            repo_info = self.github_client.get_repository_info(repo_url)
+            contributors_raw = self.github_client.get_contributors(repo_url)
+            return self.github_client._build_repository_info(repo_url, repo_info, commits, contributors_raw)
+        
+        parts = [p for p in urlparse(repo_url).path.strip('/').split('/') if p]
+        name = parts[-1][:-4] if parts and parts[-1].endswith('.git') else (parts[-1] if parts else repo_url)
+        owner = parts[-2] if len(parts) > 1 else ""
+        url = self._remote(repo_url)
+        
+        contributors: Dict[str, None] = {}
+        for commit in commits:
+            contributors.setdefault(self._contributor_login(commit))
+        
+        return RepositoryInfo(
+            url=url,
+            name=name,
+            owner=owner,
+            created_at=min((c.timestamp for c in commits), default=datetime.now().astimezone()),
+            commits=commits,
+            contributors=list(contributors)
+        )
@@ -1,21 +1,64 @@
 """
 GitHub API client for repository analysis.
 """
+import base64
+import json
 import logging
+import tarfile
+import threading
 import time
+from collections import Counter, deque
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from urllib.parse import urlparse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Mapping, Optional, Any, Tuple
+from urllib.parse import parse_qs, urlparse
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .blob_store import BlobStore, git_blob_sha
+from .code_files import MAX_CODE_FILE_SIZE, is_code_path
 from .config import config
+from .http_cache import HTTPCache
 from .models import RepositoryInfo, CommitInfo
+from .rate_limit import RateLimitBudget
 
 
 logger = logging.getLogger(__name__)
 
+# Page size of the REST list endpoints.
+COMMITS_PER_PAGE = 100
+
+# Marks a streamed commit whose detail fetch depends on commits not yet seen.
+_UNDECIDED = object()
+
+
+# Selection for one aliased repository in a batched GraphQL history query.
+GRAPHQL_REPOSITORY_SELECTION = """
+  %(alias)s: repository(owner: %(owner)s, name: %(name)s) {
+    name
+    createdAt
+    owner { login }
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 100, after: %(cursor)s, since: $since, until: $until) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { name email date user { login } }
+            }
+          }
+        }
+      }
+    }
+  }
+"""
+
 
 class GitHubAPIError(Exception):
     """Custom exception for GitHub API errors."""
@@ -25,20 +68,49 @@ class GitHubAPIError(Exception):
 class GitHubClient:
     """GitHub API client with rate limiting and error handling."""
     
-    def __init__(self):
+    def __init__(self, rate_limit: Optional[RateLimitBudget] = None, cache: Optional[HTTPCache] = None,
+                 blob_store: Optional[BlobStore] = None):
         self.base_url = config.github.base_url
         self.token = config.github.token
         self.timeout = config.github.timeout
         self.max_retries = config.github.max_retries
-        self.rate_limit_delay = config.github.rate_limit_delay
+        self.max_concurrency = config.github.max_concurrency
+        # Held for every request, so nested fan-out (page prefetch, commit
+        # details, async callers) never has more than max_concurrency in flight.
+        self._request_slots = threading.BoundedSemaphore(self.max_concurrency)
+        # Shared by every fan-out (page prefetch, commit details) instead of a
+        # pool per call; its tasks never wait on each other, so it cannot deadlock.
+        self._fanout = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="github-fanout")
+        self.code_fetch_mode = config.github.code_fetch_mode
+        self.graphql_batch_size = config.github.graphql_batch_size
+        self.commit_detail_policy = config.github.commit_detail_policy
+        self.commit_detail_limit = config.github.commit_detail_limit
+        self.rate_limit = rate_limit or RateLimitBudget(
+            reserve=config.github.rate_limit_reserve,
+            pace_below=config.github.rate_limit_pace_below
+        )
+        self.cache = cache
+        if self.cache is None and config.github.cache_path:
+            self.cache = HTTPCache(config.github.cache_path)
+        # One store per client, so identical files are fetched once per event.
+        self.blob_store = blob_store
+        if self.blob_store is None:
+            self.blob_store = BlobStore.from_allow_list(config.github.boilerplate_blobs_file,
+                                                        config.github.blob_store_max_mb * 1024 * 1024)
         
         self.session = requests.Session()
+        # Rate-limit responses (429/403) are handled by the budget in _send,
+        # so the transport only retries genuine server errors.
         retry_strategy = Retry(
             total=self.max_retries,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.max_concurrency,
+            pool_maxsize=self.max_concurrency
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
         
@@ -61,23 +133,77 @@ class GitHubClient:
         
         return owner, repo
     
+    def _rate_limit_wait(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Return how long to back off for a rate-limited response, or None."""
+        if response.status_code not in (403, 429):
+            return None
+        
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset_time = float(response.headers.get('X-RateLimit-Reset', time.time() + 60))
+            return max(reset_time - time.time(), 0) + 1
+        
+        if response.status_code == 429 or 'rate limit' in response.text.lower():
+            # Secondary limit without Retry-After: GitHub asks for at least a
+            # minute, growing exponentially on repeated hits.
+            return 60 * (2 ** attempt)
+        
+        return None
+    
+    def _send(self, method: str, url: str, resource: str = "core", **kwargs) -> requests.Response:
+        """Send a request through the shared rate-limit budget and concurrency limit."""
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.max_retries + 1):
+            self.rate_limit.acquire(resource)
+            with self._request_slots:
+                response = self.session.request(method, url, **kwargs)
+            self.rate_limit.update(response.headers)
+            
+            wait = self._rate_limit_wait(response, attempt)
+            if wait is None or attempt == self.max_retries:
+                return response
+            
+            logger.warning(f"Rate limit hit ({response.status_code}). Backing off for {wait:.0f} seconds")
+            self.rate_limit.block_for(wait)
+        
+        return response
+    
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Make a request to GitHub API with error handling."""
+        return self._make_request_with_headers(endpoint, params)[0]
+    
+    def _make_request_with_headers(self, endpoint: str, params: Optional[Dict] = None) -> Tuple[Any, Mapping[str, str]]:
+        """Make a request and return the decoded body with the response (or cached) headers."""
         url = f"{self.base_url}/{endpoint}"
         
+        cache_key = None
+        cached = None
+        headers = {}
+        if self.cache:
+            cache_key = self.cache.make_key(url, params)
+            cached = self.cache.get(cache_key)
+            if cached:
+                headers = cached.conditional_headers()
+        
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            response = self._send("GET", url, params=params, headers=headers)
             
-            if response.status_code == 429:
-                reset_time = int(response.headers.get('X-RateLimit-Reset', time.time() + 60))
-                sleep_time = reset_time - int(time.time()) + 1
-                logger.warning(f"Rate limit hit. Sleeping for {sleep_time} seconds")
-                time.sleep(sleep_time)
-                return self._make_request(endpoint, params)
+            if response.status_code == 304 and cached:
+                logger.debug(f"Not modified, using cached response for {endpoint}")
+                return cached.json(), cached.headers
             
             response.raise_for_status()
-            return response.json()
-            
+            if self.cache:
+                self.cache.put(cache_key, url, response)
+            return response.json(), response.headers
+        
         except requests.exceptions.RequestException as e:
             logger.error(f"GitHub API request failed: {e}")
             raise GitHubAPIError(f"API request failed: {e}")
@@ -89,38 +215,77 @@ class GitHubClient:
     
     def get_commits(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict]:
         """Get commits from repository."""
+        return [commit for page in self.iter_commit_pages(repo_url, since, until) for commit in page]
+    
+    def iter_commit_pages(self, repo_url: str, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None) -> Iterator[List[Dict]]:
+        """Yield raw commit list pages, newest first, as they are fetched."""
         owner, repo = self.parse_repo_url(repo_url)
         
-        params = {"per_page": 100}
+        params = {"per_page": COMMITS_PER_PAGE}
         if since:
             params["since"] = since.isoformat()
         if until:
             params["until"] = until.isoformat()
         
-        commits = []
-        page = 1
+        return self._paginate(f"repos/{owner}/{repo}/commits", params)
+    
+    def _link_page(self, headers: Mapping[str, str], rel: str) -> Optional[int]:
+        """Page number of the ``rel`` link in a Link header, if present."""
+        for link in requests.utils.parse_header_links(headers.get('Link', '')):
+            if link.get('rel') == rel:
+                page = parse_qs(urlparse(link['url']).query).get('page')
+                return int(page[0]) if page else None
+        return None
+    
+    def _paginate(self, endpoint: str, params: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """Yield every page of a REST list endpoint, in order.
         
-        while True:
-            params["page"] = page
-            page_commits = self._make_request(f"repos/{owner}/{repo}/commits", params)
-            
-            if not page_commits:
-                break
-                
-            commits.extend(page_commits)
-            
-            if len(page_commits) < 100:
+        The first response's ``Link: rel="last"`` header gives the page
+        count, and the remaining pages are fetched concurrently (at most
+        ``max_concurrency`` ahead of the consumer, and within the client-wide
+        request limit shared with every other caller). Without a "last" link,
+        "next" links are followed one at a time; without either, the first
+        page is the only one.
+        """
+        params = dict(params or {})
+        params["page"] = 1
+        first_page, headers = self._make_request_with_headers(endpoint, params)
+        if not first_page:
+            return
+        yield first_page
+        
+        last_page = self._link_page(headers, "last")
+        if last_page is None:
+            next_page = self._link_page(headers, "next")
+            while next_page:
+                page_items, headers = self._make_request_with_headers(endpoint, dict(params, page=next_page))
+                if not page_items:
+                    return
+                yield page_items
+                next_page = self._link_page(headers, "next")
+            return
+        
+        pages = iter(range(2, last_page + 1))
+        in_flight: Deque[Future] = deque()
+        for page in pages:
+            in_flight.append(self._fanout.submit(self._make_request, endpoint, dict(params, page=page)))
+            if len(in_flight) >= self.max_concurrency:
                 break
-                
-            page += 1
-            time.sleep(self.rate_limit_delay)
         
-        return commits
+        while in_flight:
+            page_items = in_flight.popleft().result()
+            next_page = next(pages, None)
+            if next_page is not None:
+                in_flight.append(self._fanout.submit(self._make_request, endpoint, dict(params, page=next_page)))
+            if page_items:
+                yield page_items
     
     def get_contributors(self, repo_url: str) -> List[Dict]:
         """Get repository contributors."""
         owner, repo = self.parse_repo_url(repo_url)
-        return self._make_request(f"repos/{owner}/{repo}/contributors")
+        pages = self._paginate(f"repos/{owner}/{repo}/contributors", {"per_page": 100})
+        return [contributor for page in pages for contributor in page]
     
     def get_commit_details(self, repo_url: str, commit_sha: str) -> Dict:
         """Get detailed commit information including files changed."""
@@ -133,66 +298,239 @@ class GitHubClient:
             date_str = date_str[:-1] + '+00:00'
         return datetime.fromisoformat(date_str)
     
-    def analyze_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> RepositoryInfo:
-        """Perform comprehensive repository analysis."""
+    def _select_detail_indices(self, commits_raw: List[Dict], window: Optional[Tuple[datetime, datetime]] = None) -> List[int]:
+        """Pick which commits get a detail fetch under the configured policy.
+        
+        Policies: "all" (every commit), "recent" (newest K, API order),
+        "edges" (oldest K and newest K) and "window" (every commit outside
+        ``window`` plus the oldest K, i.e. what the timing and large-initial
+        checks weigh by size). K is ``commit_detail_limit``.
+        """
+        total = len(commits_raw)
+        limit = self.commit_detail_limit
+        policy = self.commit_detail_policy
+        
+        if policy == "all":
+            return list(range(total))
+        if policy == "recent":
+            return list(range(min(limit, total)))
+        
+        # The API lists newest first, so the oldest commits sit at the end.
+        selected = set(range(max(total - limit, 0), total))
+        if policy == "window" and window:
+            start, end = window
+            for i, commit_data in enumerate(commits_raw):
+                timestamp = self._parse_datetime(commit_data['commit']['author']['date'])
+                if timestamp < start or timestamp > end:
+                    selected.add(i)
+        else:
+            selected.update(range(min(limit, total)))
+        
+        return sorted(selected)
+    
+    def _wants_detail(self, index: int, commit_data: Dict, window: Optional[Tuple[datetime, datetime]]) -> bool:
+        """Whether the detail policy selects a commit, short of the oldest-K rule."""
+        policy = self.commit_detail_policy
+        if policy == "all":
+            return True
+        if policy == "window" and window:
+            timestamp = self._parse_datetime(commit_data['commit']['author']['date'])
+            return timestamp < window[0] or timestamp > window[1]
+        return index < self.commit_detail_limit
+    
+    def iter_commits(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     detail_window: Optional[Tuple[datetime, datetime]] = None) -> Iterator[CommitInfo]:
+        """Stream a repository's commits, newest first, as pages arrive.
+        
+        Selects the same commits for detail fetches as ``analyze_repository``.
+        A page's detail fetches are submitted to the client's shared fan-out
+        pool as soon as the page arrives, so they overlap with fetching the
+        next page without exceeding the client-wide request limit. Commits are
+        yielded in API order once their details are in. The generator holds
+        only the commits still waiting on details, plus the oldest-K
+        candidates kept by the "edges" and "window" policies until the last
+        page; a consumer that collects the commits, as ``analyze_team`` does,
+        still ends up holding the full history.
+        """
+        limit = self.commit_detail_limit
+        keeps_oldest = self.commit_detail_policy in ("edges", "window")
+        # Yield without waiting on details until this many commits are queued.
+        backlog = 2 * COMMITS_PER_PAGE + limit
+        
+        entries: Deque[list] = deque()
+        oldest: Deque[Tuple[int, list]] = deque()
+        streamed = detailed = 0
+        
+        def ready() -> Iterator[CommitInfo]:
+            nonlocal streamed
+            while entries and entries[0][1] is not _UNDECIDED:
+                commit_data, future = entries[0]
+                if future is not None and not future.done() and len(entries) <= backlog:
+                    return
+                entries.popleft()
+                streamed += 1
+                yield self._build_commit_info(commit_data, future.result() if future else None)
+        
+        def fetch_details(commit_data: Dict) -> Future:
+            nonlocal detailed
+            detailed += 1
+            return self._fanout.submit(self._get_commit_details_safe, repo_url, commit_data['sha'])
+        
+        index = 0
+        for page in self.iter_commit_pages(repo_url, since, until):
+            for commit_data in page:
+                entry = [commit_data, None]
+                if self._wants_detail(index, commit_data, detail_window):
+                    entry[1] = fetch_details(commit_data)
+                elif keeps_oldest:
+                    entry[1] = _UNDECIDED
+                    oldest.append((index, entry))
+                # Anything more than K commits from the end is not among the oldest K.
+                while oldest and oldest[0][0] <= index - limit:
+                    oldest.popleft()[1][1] = None
+                entries.append(entry)
+                index += 1
+            yield from ready()
+        
+        for _, entry in oldest:
+            entry[1] = fetch_details(entry[0])
+        while entries:
+            commit_data, future = entries.popleft()
+            streamed += 1
+            yield self._build_commit_info(commit_data, future.result() if future else None)
+        
+        logger.info(f"Streamed {streamed} commits from {repo_url} ({detailed} with detailed stats)")
+    
+    def stream_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          detail_window: Optional[Tuple[datetime, datetime]] = None
+                          ) -> Tuple[RepositoryInfo, Iterator[CommitInfo]]:
+        """Repository metadata with an empty commit list, and a stream of its commits.
+        
+        Pass the stream to ``CommitAnalyzer.analyze_team``, which consumes it
+        once and stores the commits on the returned ``RepositoryInfo``.
+        """
+        logger.info(f"Streaming repository: {repo_url}")
+        repo_info = self.get_repository_info(repo_url)
+        contributors_raw = self.get_contributors(repo_url)
+        return (self._build_repository_info(repo_url, repo_info, [], contributors_raw),
+                self.iter_commits(repo_url, since, until, detail_window))
+    
+    def _get_commit_details_safe(self, repo_url: str, commit_sha: str) -> Optional[Dict]:
+        """Fetch commit details, returning None instead of raising."""
+        try:
+            return self.get_commit_details(repo_url, commit_sha)
+        except Exception as e:
+            logger.warning(f"Failed to get detailed stats for commit {commit_sha[:8]}: {e}")
+            return None
+    
+    def _build_commits(self, commits_raw: List[Dict], details: Dict[int, Optional[Dict]]) -> List[CommitInfo]:
+        """Build CommitInfo objects, using fetched details where available."""
+        skipped = len(commits_raw) - len(details)
+        if skipped:
+            logger.info(f"Processing {skipped} additional commits without detailed stats")
+        
+        return [
+            self._build_commit_info(commit_data, details.get(i))
+            for i, commit_data in enumerate(commits_raw)
+        ]
+    
+    def get_head_sha(self, repo_url: str) -> str:
+        """Get the SHA of the default branch head (a 304 when unchanged)."""
+        owner, repo = self.parse_repo_url(repo_url)
+        commits = self._make_request(f"repos/{owner}/{repo}/commits", {"per_page": 1})
+        if not commits:
+            raise GitHubAPIError(f"Repository has no commits: {repo_url}")
+        return commits[0]['sha']
+    
+    def _incremental_since(self, previous: RepositoryInfo, since: Optional[datetime]) -> datetime:
+        """Start of the window that can hold commits newer than ``previous``."""
+        newest = max(commit.timestamp for commit in previous.commits)
+        return max(newest, since) if since else newest
+    
+    def _new_commits(self, previous: RepositoryInfo, commits_raw: List[Dict]) -> Optional[List[Dict]]:
+        """Return commits not in ``previous``, or None when they do not extend it.
+        
+        The new commits must build on the previous head: it has to be a parent
+        of one of them, and every parent must be known, either from the
+        previous run or among the new commits. With no new commits the head
+        must not have moved. Anything else means the history was amended,
+        reset or rebased, or the ``since`` window missed something, and a
+        full fetch is needed.
+        """
+        previous_head = previous.commits[0].sha
+        known = {commit.sha for commit in previous.commits}
+        new_raw = [commit_data for commit_data in commits_raw if commit_data['sha'] not in known]
+        
+        if not new_raw:
+            return new_raw if commits_raw and commits_raw[0]['sha'] == previous_head else None
+        
+        known.update(commit_data['sha'] for commit_data in new_raw)
+        extends_head = False
+        for commit_data in new_raw:
+            parents = [parent['sha'] for parent in commit_data.get('parents', [])]
+            if any(parent not in known for parent in parents):
+                return None
+            extends_head = extends_head or previous_head in parents
+        return new_raw if extends_head else None
+    
+    def analyze_repository(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                           detail_window: Optional[Tuple[datetime, datetime]] = None,
+                           previous: Optional[RepositoryInfo] = None) -> RepositoryInfo:
+        """Perform comprehensive repository analysis.
+        
+        Commit details are fetched concurrently for the commits chosen by the
+        detail policy; ``detail_window`` is the allowed (start, end) period
+        used by the "window" policy. With ``previous`` from an earlier run,
+        only newer commits are fetched and merged into its history.
+        """
         logger.info(f"Analyzing repository: {repo_url}")
         
         repo_info = self.get_repository_info(repo_url)
-        commits_raw = self.get_commits(repo_url, since, until)
         contributors_raw = self.get_contributors(repo_url)
         
-        commits = []
-        for i, commit_data in enumerate(commits_raw[:20]):
-            try:
-                detailed_commit = self.get_commit_details(repo_url, commit_data['sha'])
-                stats = detailed_commit.get('stats', {})
-                files = detailed_commit.get('files', [])
-                
-                commit = CommitInfo(
-                    sha=commit_data['sha'],
-                    author=commit_data['commit']['author']['name'],
-                    author_email=commit_data['commit']['author']['email'],
-                    timestamp=self._parse_datetime(commit_data['commit']['author']['date']),
-                    message=commit_data['commit']['message'],
-                    additions=stats.get('additions', 0),
-                    deletions=stats.get('deletions', 0),
-                    total_changes=stats.get('additions', 0) + stats.get('deletions', 0),
-                    files_changed=len(files)
-                )
-                commits.append(commit)
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.warning(f"Failed to get detailed stats for commit {commit_data['sha'][:8]}: {e}")
-                commit = CommitInfo(
-                    sha=commit_data['sha'],
-                    author=commit_data['commit']['author']['name'],
-                    author_email=commit_data['commit']['author']['email'],
-                    timestamp=self._parse_datetime(commit_data['commit']['author']['date']),
-                    message=commit_data['commit']['message'],
-                    additions=0,
-                    deletions=0,
-                    total_changes=0,
-                    files_changed=0
-                )
-                commits.append(commit)
-        
-        if len(commits_raw) > 20:
-            logger.info(f"Processing {len(commits_raw) - 20} additional commits without detailed stats")
-            for commit_data in commits_raw[20:]:
-                commit = CommitInfo(
-                    sha=commit_data['sha'],
-                    author=commit_data['commit']['author']['name'],
-                    author_email=commit_data['commit']['author']['email'],
-                    timestamp=self._parse_datetime(commit_data['commit']['author']['date']),
-                    message=commit_data['commit']['message'],
-                    additions=0,
-                    deletions=0,
-                    total_changes=0,
-                    files_changed=0
-                )
-                commits.append(commit)
+        known_commits = []
+        if previous and previous.commits:
+            commits_raw = self.get_commits(repo_url, self._incremental_since(previous, since), until)
+            new_raw = self._new_commits(previous, commits_raw)
+            if new_raw is None:
+                logger.info(f"History of {repo_url} was rewritten, fetching it in full")
+                commits_raw = self.get_commits(repo_url, since, until)
+            else:
+                logger.info(f"Found {len(new_raw)} new commits since the last run")
+                commits_raw = new_raw
+                known_commits = previous.commits
+        else:
+            commits_raw = self.get_commits(repo_url, since, until)
         
+        indices = self._select_detail_indices(commits_raw, detail_window)
+        fetched = self._fanout.map(
+            lambda i: self._get_commit_details_safe(repo_url, commits_raw[i]['sha']),
+            indices
+        )
+        details = dict(zip(indices, fetched))
+        
+        commits = self._build_commits(commits_raw, details) + known_commits
+        return self._build_repository_info(repo_url, repo_info, commits, contributors_raw)
+    
+    def _build_commit_info(self, commit_data: Dict, detailed_commit: Optional[Dict] = None) -> CommitInfo:
+        """Build a CommitInfo from a commit list item and optional commit details."""
+        stats = (detailed_commit or {}).get('stats', {})
+        files = (detailed_commit or {}).get('files', [])
+        
+        return CommitInfo(
+            sha=commit_data['sha'],
+            author=commit_data['commit']['author']['name'],
+            author_email=commit_data['commit']['author']['email'],
+            timestamp=self._parse_datetime(commit_data['commit']['author']['date']),
+            message=commit_data['commit']['message'],
+            additions=stats.get('additions', 0),
+            deletions=stats.get('deletions', 0),
+            total_changes=stats.get('additions', 0) + stats.get('deletions', 0),
+            files_changed=len(files)
+        )
+    
+    def _build_repository_info(self, repo_url: str, repo_info: Dict, commits: List[CommitInfo], contributors_raw: List[Dict]) -> RepositoryInfo:
+        """Assemble a RepositoryInfo from raw API payloads."""
         contributors = [contributor['login'] for contributor in contributors_raw]
         
         return RepositoryInfo(
@@ -202,8 +540,127 @@ class GitHubClient:
             created_at=self._parse_datetime(repo_info['created_at']),
             commits=commits,
             contributors=contributors
-        ) 
-
+        )
+    
+    def _graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Run a GraphQL query, returning the response payload (data and errors)."""
+        url = f"{self.base_url}/graphql"
+        
+        try:
+            response = self._send("POST", url, resource="graphql", json={"query": query, "variables": variables or {}})
+            response.raise_for_status()
+            payload = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"GitHub GraphQL request failed: {e}")
+            raise GitHubAPIError(f"GraphQL request failed: {e}")
+        
+        if payload.get('errors') and not payload.get('data'):
+            raise GitHubAPIError(f"GraphQL query failed: {payload['errors'][0].get('message')}")
+        return payload
+    
+    def _build_commit_info_from_graphql(self, node: Dict) -> CommitInfo:
+        """Build a CommitInfo from a GraphQL history node."""
+        author = node.get('author') or {}
+        additions = node.get('additions') or 0
+        deletions = node.get('deletions') or 0
+        
+        return CommitInfo(
+            sha=node['oid'],
+            author=author.get('name') or "",
+            author_email=author.get('email') or "",
+            timestamp=self._parse_datetime(author['date']),
+            message=node['message'],
+            additions=additions,
+            deletions=deletions,
+            total_changes=additions + deletions,
+            files_changed=node.get('changedFilesIfAvailable') or 0
+        )
+    
+    def analyze_repositories_graphql(self, repo_urls: List[str], since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, RepositoryInfo]:
+        """Fetch full commit histories with stats for several repositories at once.
+        
+        Up to ``graphql_batch_size`` repositories are aliased into one query and
+        each page returns 100 commits per repository, so N commits cost about
+        ceil(N/100) requests shared across the batch. Contributors are the
+        linked GitHub users among commit authors. Repositories that cannot be
+        resolved are left out of the result.
+        """
+        cursors = {url: None for url in repo_urls}
+        metadata: Dict[str, Dict] = {}
+        commits: Dict[str, List[CommitInfo]] = {url: [] for url in repo_urls}
+        logins: Dict[str, Counter] = {url: Counter() for url in repo_urls}
+        variables = {
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None
+        }
+        
+        while cursors:
+            batch = list(cursors)[:self.graphql_batch_size]
+            selections = []
+            for i, url in enumerate(batch):
+                owner, repo = self.parse_repo_url(url)
+                selections.append(GRAPHQL_REPOSITORY_SELECTION % {
+                    "alias": f"r{i}",
+                    "owner": json.dumps(owner),
+                    "name": json.dumps(repo),
+                    "cursor": json.dumps(cursors[url])
+                })
+            query = "query($since: GitTimestamp, $until: GitTimestamp) {%s}" % "".join(selections)
+            
+            payload = self._graphql(query, variables)
+            data = payload.get('data') or {}
+            for error in payload.get('errors', []):
+                logger.warning(f"GraphQL error: {error.get('message')}")
+            
+            for i, url in enumerate(batch):
+                repository = data.get(f"r{i}")
+                if repository is None:
+                    logger.warning(f"GraphQL returned no repository for {url}")
+                    del cursors[url]
+                    continue
+                
+                metadata[url] = repository
+                target = (repository.get('defaultBranchRef') or {}).get('target') or {}
+                history = target.get('history')
+                if not history:
+                    del cursors[url]
+                    continue
+                
+                for node in history['nodes']:
+                    commits[url].append(self._build_commit_info_from_graphql(node))
+                    user = (node.get('author') or {}).get('user')
+                    if user:
+                        logins[url][user['login']] += 1
+                
+                if history['pageInfo']['hasNextPage']:
+                    cursors[url] = history['pageInfo']['endCursor']
+                else:
+                    del cursors[url]
+        
+        results = {}
+        for url, repository in metadata.items():
+            results[url] = RepositoryInfo(
+                url=url,
+                name=repository['name'],
+                owner=repository['owner']['login'],
+                created_at=self._parse_datetime(repository['createdAt']),
+                commits=commits[url],
+                contributors=[login for login, _ in logins[url].most_common()]
+            )
+        return results
+    
+    def analyze_repository_graphql(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> RepositoryInfo:
+        """Perform comprehensive repository analysis through the GraphQL API."""
+        logger.info(f"Analyzing repository (GraphQL): {repo_url}")
+        results = self.analyze_repositories_graphql([repo_url], since, until)
+        if repo_url not in results:
+            raise GitHubAPIError(f"Repository not found via GraphQL: {repo_url}")
+        return results[repo_url]
+    
+    def get_commit_history_graphql(self, repo_url: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[CommitInfo]:
+        """Get the full commit history with per-commit stats via GraphQL."""
+        return self.analyze_repository_graphql(repo_url, since, until).commits
+    
     def get_repository_tree(self, repo_url: str) -> List[Dict]:
         """Get complete file tree of repository."""
         owner, repo = self.parse_repo_url(repo_url)
@@ -216,68 +673,126 @@ class GitHubClient:
         owner, repo = self.parse_repo_url(repo_url)
         return self._make_request(f"repos/{owner}/{repo}/contents/{file_path}")
     
-    def get_code_files(self, repo_url: str, max_files: int = 50) -> List[Dict]:
+    def get_code_files(self, repo_url: str, max_files: Optional[int] = 50, mode: Optional[str] = None) -> List[Dict]:
         """Get contents of code files from repository."""
-        logger.info(f"Fetching code files from {repo_url}")
+        mode = mode or self.code_fetch_mode
+        if mode == "tarball":
+            return self.get_code_files_from_tarball(repo_url, max_files)
         
-        code_extensions = {
-            '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.h', 
-            '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala',
-            '.html', '.css', '.scss', '.less', '.vue', '.svelte'
-        }
+        logger.info(f"Fetching code files from {repo_url}")
         
         try:
             tree_data = self.get_repository_tree(repo_url)
-            tree_items = tree_data.get('tree', [])
-            
-            code_files = []
-            for item in tree_items:
-                if item['type'] == 'blob':
-                    file_path = item['path']
-                    file_ext = '.' + file_path.split('.')[-1] if '.' in file_path else ''
-                    
-                    if file_ext.lower() in code_extensions:
-                        if any(skip in file_path.lower() for skip in ['node_modules', '__pycache__', '.git', 'dist', 'build']):
-                            continue
-                        
-                        code_files.append({
-                            'path': file_path,
-                            'sha': item['sha'],
-                            'size': item.get('size', 0),
-                            'url': item['url']
-                        })
-            
-            code_files = code_files[:max_files]
+            code_files = self._select_code_files(tree_data.get('tree', []), max_files)
             
             file_contents = []
             for file_info in code_files:
+                stored = self.blob_store.get(file_info['sha'], file_info['path'])
+                if stored:
+                    file_contents.append(stored)
+                    continue
+                
                 try:
                     logger.info(f"  Fetching: {file_info['path']}")
                     content_data = self.get_file_content(repo_url, file_info['path'])
                     
-                    import base64
-                    if content_data.get('encoding') == 'base64':
-                        try:
-                            content = base64.b64decode(content_data['content']).decode('utf-8')
-                            file_contents.append({
-                                'path': file_info['path'],
-                                'content': content,
-                                'size': len(content),
-                                'sha': file_info['sha'],
-                                'lines': len(content.split('\n'))
-                            })
-                        except UnicodeDecodeError:
-                            logger.warning(f"  Skipping binary file: {file_info['path']}")
-                    
-                    time.sleep(0.1)
-                    
+                    decoded = self._decode_file_content(file_info, content_data)
+                    if decoded:
+                        file_contents.append(decoded)
+                
                 except Exception as e:
                     logger.warning(f"  Failed to fetch {file_info['path']}: {e}")
                     continue
             
             logger.info(f"Successfully fetched {len(file_contents)} code files")
             return file_contents
-            
+        
         except Exception as e:
             logger.error(f"Failed to fetch code files from {repo_url}: {e}")
-            return [] 
\ No newline at end of file
+            return []
+    
+    def get_code_files_from_tarball(self, repo_url: str, max_files: Optional[int] = None) -> List[Dict]:
+        """Get code files by streaming the repository tarball in a single request."""
+        logger.info(f"Fetching code files from {repo_url} (tarball)")
+        owner, repo = self.parse_repo_url(repo_url)
+        url = f"{self.base_url}/repos/{owner}/{repo}/tarball"
+        
+        try:
+            response = self._send("GET", url, stream=True)
+            response.raise_for_status()
+            
+            file_contents = []
+            with response:
+                response.raw.decode_content = True
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                    for member in archive:
+                        if not member.isfile() or '/' not in member.name:
+                            continue
+                        
+                        # Entries live under a single "<owner>-<repo>-<sha>/" prefix.
+                        file_path = member.name.split('/', 1)[1]
+                        if not is_code_path(file_path):
+                            continue
+                        
+                        if member.size > MAX_CODE_FILE_SIZE:
+                            logger.info(f"  Skipping large file: {file_path} ({member.size} bytes)")
+                            continue
+                        
+                        data = archive.extractfile(member).read()
+                        blob_sha = git_blob_sha(data)
+                        if self.blob_store.is_boilerplate(blob_sha):
+                            continue
+                        
+                        # The whole tarball is downloaded anyway, so blobs are not stored for reuse.
+                        decoded = self._decode_blob(file_path, data, blob_sha)
+                        if decoded:
+                            file_contents.append(decoded)
+                        
+                        if max_files and len(file_contents) >= max_files:
+                            break
+            
+            logger.info(f"Successfully fetched {len(file_contents)} code files")
+            return file_contents
+        
+        except (requests.exceptions.RequestException, tarfile.TarError) as e:
+            logger.error(f"Failed to fetch code files from {repo_url}: {e}")
+            return []
+    
+    def _select_code_files(self, tree_items: List[Dict], max_files: Optional[int]) -> List[Dict]:
+        """Filter tree entries down to the code files worth comparing."""
+        code_files = []
+        for item in tree_items:
+            if (item['type'] == 'blob' and is_code_path(item['path'])
+                    and not self.blob_store.is_boilerplate(item['sha'])):
+                code_files.append({
+                    'path': item['path'],
+                    'sha': item['sha'],
+                    'size': item.get('size', 0),
+                    'url': item['url']
+                })
+        
+        return code_files[:max_files]
+    
+    def _decode_file_content(self, file_info: Dict, content_data: Dict) -> Optional[Dict]:
+        """Decode a contents API payload, returning None for binary files."""
+        if content_data.get('encoding') != 'base64':
+            return None
+        
+        decoded = self._decode_blob(file_info['path'], base64.b64decode(content_data['content']), file_info['sha'])
+        return self.blob_store.put(decoded) if decoded else None
+    
+    def _decode_blob(self, file_path: str, data: bytes, blob_sha: Optional[str] = None) -> Optional[Dict]:
+        """Decode raw file bytes into a code file record, returning None for binary files."""
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            logger.warning(f"  Skipping binary file: {file_path}")
+            return None
+        
+        return {
+            'path': file_path,
+            'content': content,
+            'size': len(content),
+            'sha': blob_sha or git_blob_sha(data),
+            'lines': len(content.split('\n'))
+        }
@@ -0,0 +1,115 @@
+"""
+Persistent HTTP response cache for conditional GitHub requests.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept alongside the body so a 304 can be answered in full.
+STORED_HEADERS = ('Link',)
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body with its validators."""
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that turn the next request into a conditional one."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+    
+    def json(self):
+        """Decode the cached body as JSON."""
+        return json.loads(self.body)
+
+
+class HTTPCache:
+    """SQLite-backed store of responses keyed by URL and query parameters.
+    
+    Entries keep the ETag/Last-Modified validators so repeated runs can send
+    conditional requests; GitHub answers unchanged resources with 304, which
+    does not count against the rate limit.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Build a stable cache key from the URL and sorted query parameters."""
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for ``key``, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, headers FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        
+        body, etag, last_modified, headers = row
+        return CachedResponse(
+            body=body,
+            etag=etag,
+            last_modified=last_modified,
+            headers=json.loads(headers) if headers else {}
+        )
+    
+    def put(self, key: str, url: str, response) -> bool:
+        """Store a successful response if it carries a validator."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return False
+        
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, headers, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, json.dumps(headers), response.content, time.time())
+            )
+        return True
+    
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
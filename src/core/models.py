@@ -3,7 +3,7 @@ Data models for hackathon commit history review system.
 """
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, HttpUrl, field_validator
+from pydantic import AnyUrl, BaseModel, HttpUrl, field_validator
 from enum import Enum
 
 
@@ -31,7 +31,7 @@ class Team(BaseModel):
     team_name: str
     members: List[TeamMember]
     devpost_url: Optional[HttpUrl] = None
-    repository_url: HttpUrl
+    repository_url: AnyUrl
     
     @field_validator('members')
     @classmethod
@@ -73,7 +73,7 @@ class CommitInfo(BaseModel):
 
 class RepositoryInfo(BaseModel):
     """Information about a repository."""
-    url: HttpUrl
+    url: AnyUrl
     name: str
     owner: str
     created_at: datetime
@@ -90,6 +90,12 @@ class Violation(BaseModel):
     timestamp: Optional[datetime] = None
 
 
+class CodeFileFingerprints(BaseModel):
+    """Winnowing fingerprints of one fetched code file."""
+    path: str
+    fingerprints: List[int]
+
+
 class TeamAnalysisResult(BaseModel):
     """Result of analyzing a team's repository."""
     team: Team
@@ -98,6 +104,8 @@ class TeamAnalysisResult(BaseModel):
     is_flagged: bool
     summary: str
     analysis_timestamp: datetime
+    # Persisted with the result so reused teams still take part in cross-team comparison.
+    code_files: List[CodeFileFingerprints] = []
     
     @field_validator('is_flagged')
     @classmethod
@@ -111,6 +119,15 @@ class TeamAnalysisResult(BaseModel):
         return False
 
 
+class RepositoryState(BaseModel):
+    """Persisted per-repository state for incremental re-analysis."""
+    repository_url: str
+    head_sha: str
+    repository_info: RepositoryInfo
+    result: Optional[TeamAnalysisResult] = None
+    updated_at: datetime
+
+
 class AnalysisReport(BaseModel):
     """Complete analysis report for all teams."""
     hackathon_config: HackathonConfig
@@ -0,0 +1,127 @@
+"""
+Rate-limit budget shared by every GitHub request.
+"""
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _ResourceBucket:
+    """Request budget for one GitHub rate-limit resource (core, graphql, ...)."""
+    
+    def __init__(self, reserve: int, pace_below: float):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.used: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.next_slot = 0.0
+    
+    def update(self, limit: int, remaining: int, reset: float, used: Optional[int]):
+        """Merge rate-limit headers from a response into the bucket."""
+        if self.reset is None or reset > self.reset:
+            # New window: the server's count is authoritative.
+            self.remaining = remaining
+        else:
+            # Same window: responses can arrive out of order, keep the lower count.
+            self.remaining = min(self.remaining, remaining)
+        self.limit = limit
+        self.reset = reset
+        self.used = used
+    
+    def take(self, now: float) -> float:
+        """Consume one request, or return how long to wait before retrying."""
+        if self.remaining is None:
+            return 0.0
+        
+        if self.reset is not None and now >= self.reset:
+            # The window rolled over; optimistically assume a fresh quota
+            # until the next response reports the real numbers.
+            self.remaining = self.limit
+            self.reset = None
+            self.next_slot = 0.0
+        
+        available = self.remaining - self.reserve
+        if available <= 0:
+            return (self.reset - now + 1) if self.reset else 1.0
+        
+        if self.reset is not None and self.remaining <= self.limit * self.pace_below:
+            # Spread what is left evenly over the rest of the window so the
+            # quota runs out exactly when it resets instead of hitting a wall.
+            if self.next_slot > now:
+                return self.next_slot - now
+            self.next_slot = now + (self.reset - now) / available
+        
+        self.remaining -= 1
+        return 0.0
+
+
+class RateLimitBudget:
+    """Token-bucket request budget driven by GitHub's X-RateLimit-* headers.
+    
+    Every response updates the bucket for its resource. While plenty of
+    quota is left, requests go out at full speed. Once the remaining quota
+    falls below ``pace_below`` of the limit, requests are spaced so the rest
+    lasts until ``X-RateLimit-Reset``, and ``reserve`` requests are always
+    held back. Secondary-limit backoffs block every resource.
+    """
+    
+    def __init__(self, reserve: int = 50, pace_below: float = 0.2):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self._buckets: Dict[str, _ResourceBucket] = {}
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self, resource: str = "core"):
+        """Block until a request against ``resource`` may be sent."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    bucket = self._buckets.get(resource)
+                    wait = bucket.take(now) if bucket else 0.0
+                if wait <= 0:
+                    return
+            
+            if wait > 5:
+                logger.info(f"Rate-limit budget for '{resource}' exhausted. Waiting {wait:.0f} seconds")
+            time.sleep(wait)
+    
+    def update(self, headers: Mapping[str, str]):
+        """Record the X-RateLimit-* headers of a response."""
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        
+        try:
+            limit = int(headers.get('X-RateLimit-Limit', 5000))
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = float(headers.get('X-RateLimit-Reset', time.time() + 3600))
+            used = int(headers['X-RateLimit-Used']) if 'X-RateLimit-Used' in headers else None
+        except ValueError:
+            return
+        
+        resource = headers.get('X-RateLimit-Resource', 'core')
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            if bucket is None:
+                bucket = self._buckets[resource] = _ResourceBucket(self.reserve, self.pace_below)
+            bucket.update(limit, remaining, reset, used)
+        
+        logger.debug(f"Rate limit [{resource}]: {remaining}/{limit} remaining, {used} used")
+    
+    def block_for(self, seconds: float):
+        """Hold back all requests for ``seconds`` (secondary rate limits)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+    
+    def remaining(self, resource: str = "core") -> Optional[int]:
+        """Last known remaining request count for ``resource``."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket.remaining if bucket else None
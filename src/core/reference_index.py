@@ -0,0 +1,292 @@
+"""
+Inverted fingerprint index over a corpus of reference files.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .code_files import CODE_EXTENSIONS, MAX_CODE_FILE_SIZE, SKIP_PATH_PARTS
+from .fingerprint import Fingerprint
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIX = ".manifest"
+
+# File layout: magic, a JSON list of index names, then per index a header,
+# JSON metadata and the hashes (uint64), starts (uint64), posting entry ids
+# and offsets (uint32), each padded to 8 bytes.
+INDEX_MAGIC = b"UHCFPIX2"
+INDEX_HEADER = struct.Struct('<QQQ')
+
+
+@dataclass
+class ReferenceFile:
+    """A file in the reference corpus, or one block of it in a block index."""
+    path: str
+    size: int
+    fingerprint_count: int
+    content_hash: str
+    start_line: int = 0
+    end_line: int = 0
+
+
+@dataclass
+class ReferenceMatch:
+    """A reference file sharing fingerprints with a submitted file."""
+    file_id: int
+    path: str
+    shared: int
+    similarity: float
+    containment: float
+    reference_offset: int
+
+
+def collect_reference_paths(source: str) -> List[Path]:
+    """Expand a reference source into the files it names.
+    
+    ``source`` may be a single file (used as-is, whatever its extension), a
+    directory (every code file below it), or a ``.manifest`` file listing one
+    file or directory per line relative to the manifest.
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(
+            p for p in path.rglob('*')
+            if p.is_file()
+            and p.suffix.lower() in CODE_EXTENSIONS
+            and not any(part in SKIP_PATH_PARTS for part in p.relative_to(path).parts)
+            and p.stat().st_size <= MAX_CODE_FILE_SIZE
+        )
+    
+    if path.suffix == MANIFEST_SUFFIX:
+        paths = []
+        for line in path.read_text(encoding='utf-8').splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith('#'):
+                continue
+            target = path.parent / entry
+            if not target.exists():
+                logger.warning(f"Manifest {path} lists missing path {entry}")
+                continue
+            paths.extend(collect_reference_paths(str(target)))
+        return paths
+    
+    return [path] if path.is_file() else []
+
+
+class ReferenceIndex:
+    """Maps fingerprint hashes to (reference file, offset) postings.
+    
+    Distinct hashes are kept sorted in one flat array, with ``starts[i]`` to
+    ``starts[i + 1]`` delimiting the postings of ``hashes[i]``. A submitted
+    file is scored against the whole corpus in one pass over its own
+    fingerprints: each hash is binary-searched once and its postings tally
+    shared fingerprints per reference file.
+    
+    The arrays are either in-memory ``array`` objects or ``memoryview``s
+    over a memory-mapped index file (see ``save_indexes`` and
+    ``open_indexes``), so loading a saved index costs no parsing and worker
+    processes share its pages.
+    """
+    
+    def __init__(self, files: List[ReferenceFile], hashes: Sequence[int], starts: Sequence[int],
+                 posting_files: Sequence[int], posting_offsets: Sequence[int], params: Optional[Dict] = None):
+        self.files = files
+        self.hashes = hashes
+        self.starts = starts
+        self.posting_files = posting_files
+        self.posting_offsets = posting_offsets
+        self.params = params or {}
+        self._mmap = None
+        self._by_content_hash: Dict[str, int] = {}
+        for file_id, reference in enumerate(files):
+            self._by_content_hash.setdefault(reference.content_hash, file_id)
+    
+    def __len__(self) -> int:
+        return len(self.files)
+    
+    @property
+    def is_mapped(self) -> bool:
+        """Whether the arrays are views over a memory-mapped index file."""
+        return self._mmap is not None
+    
+    @property
+    def distinct_fingerprints(self) -> int:
+        """Number of distinct fingerprint hashes in the corpus."""
+        return len(self.hashes)
+    
+    def find_exact(self, content_hash: str) -> Optional[ReferenceFile]:
+        """Reference file with identical normalized content, if any."""
+        file_id = self._by_content_hash.get(content_hash)
+        return self.files[file_id] if file_id is not None else None
+    
+    def query(self, fingerprints: Set[int], top_n: int = 3) -> List[ReferenceMatch]:
+        """Return the ``top_n`` reference files most similar to a fingerprint set."""
+        if not fingerprints or not self.files:
+            return []
+        
+        hashes, starts = self.hashes, self.starts
+        posting_files, posting_offsets = self.posting_files, self.posting_offsets
+        count = len(hashes)
+        
+        shared: Counter = Counter()
+        first_offset: Dict[int, int] = {}
+        for value in fingerprints:
+            i = bisect_left(hashes, value)
+            if i == count or hashes[i] != value:
+                continue
+            for p in range(starts[i], starts[i + 1]):
+                file_id = posting_files[p]
+                offset = posting_offsets[p]
+                shared[file_id] += 1
+                if offset < first_offset.get(file_id, offset + 1):
+                    first_offset[file_id] = offset
+        
+        matches = []
+        for file_id, count in shared.items():
+            reference = self.files[file_id]
+            matches.append(ReferenceMatch(
+                file_id=file_id,
+                path=reference.path,
+                shared=count,
+                similarity=count / (len(fingerprints) + reference.fingerprint_count - count),
+                containment=count / len(fingerprints),
+                reference_offset=first_offset[file_id]
+            ))
+        
+        matches.sort(key=lambda m: (-m.similarity, -m.shared, m.file_id))
+        return matches[:top_n]
+    
+    def _write(self, f):
+        """Write this index as one section of an index file."""
+        metadata = json.dumps({
+            "params": self.params,
+            "files": [[f.path, f.size, f.fingerprint_count, f.content_hash, f.start_line, f.end_line]
+                      for f in self.files]
+        }).encode('utf-8')
+        metadata += b' ' * (-len(metadata) % 8)
+        
+        f.write(INDEX_HEADER.pack(len(metadata), len(self.hashes), len(self.posting_files)))
+        f.write(metadata)
+        for values, typecode in ((self.hashes, 'Q'), (self.starts, 'Q'),
+                                 (self.posting_files, 'I'), (self.posting_offsets, 'I')):
+            data = array(typecode, values).tobytes()
+            f.write(data + b'\0' * (-len(data) % 8))
+    
+    @classmethod
+    def _read(cls, mapped: mmap.mmap, offset: int) -> Tuple["ReferenceIndex", int]:
+        """Map one index section starting at ``offset``; return it and the next offset."""
+        metadata_size, hash_count, posting_count = INDEX_HEADER.unpack_from(mapped, offset)
+        offset += INDEX_HEADER.size
+        metadata = json.loads(mapped[offset:offset + metadata_size])
+        offset += metadata_size
+        
+        view = memoryview(mapped)
+        sections = []
+        for length, typecode in ((hash_count, 'Q'), (hash_count + 1, 'Q'),
+                                 (posting_count, 'I'), (posting_count, 'I')):
+            size = length * array(typecode).itemsize
+            sections.append(view[offset:offset + size].cast(typecode))
+            offset += size + (-size % 8)
+        
+        files = [ReferenceFile(path=p, size=size, fingerprint_count=count, content_hash=content_hash,
+                               start_line=start_line, end_line=end_line)
+                 for p, size, count, content_hash, start_line, end_line in metadata["files"]]
+        index = cls(files, *sections, params=metadata["params"])
+        index._mmap = mapped
+        return index, offset
+
+
+def save_indexes(path: str, indexes: Dict[str, ReferenceIndex]):
+    """Write named indexes to one compact binary file, atomically."""
+    names = json.dumps({"byteorder": sys.byteorder, "names": list(indexes)}).encode('utf-8')
+    names += b' ' * (-len(names) % 8)
+    
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack('<Q', len(names)))
+        f.write(names)
+        for index in indexes.values():
+            index._write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    
+    summary = ", ".join(f"{name}: {len(index)} entries" for name, index in indexes.items())
+    logger.info(f"Wrote reference index to {target} ({summary})")
+
+
+def open_indexes(path: str) -> Dict[str, ReferenceIndex]:
+    """Memory-map every index in a file written by ``save_indexes``."""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    try:
+        if mapped[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a reference index of this version")
+        offset = len(INDEX_MAGIC)
+        (names_size,) = struct.unpack_from('<Q', mapped, offset)
+        offset += 8
+        header = json.loads(mapped[offset:offset + names_size])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+        offset += names_size
+        
+        indexes = {}
+        for name in header["names"]:
+            indexes[name], offset = ReferenceIndex._read(mapped, offset)
+    except Exception:
+        mapped.close()
+        raise
+    
+    return indexes
+
+
+class ReferenceIndexBuilder:
+    """Accumulates reference files and freezes them into a ``ReferenceIndex``."""
+    
+    def __init__(self, params: Optional[Dict] = None):
+        self.params = params or {}
+        self.files: List[ReferenceFile] = []
+        self.postings: Dict[int, List[Tuple[int, int]]] = {}
+    
+    def add(self, path: str, size: int, fingerprints: Sequence[Fingerprint], content_hash: str,
+            start_line: int = 0, end_line: int = 0) -> int:
+        """Index one reference file (or block) and return its id."""
+        file_id = len(self.files)
+        first_offsets: Dict[int, int] = {}
+        for value, offset in fingerprints:
+            first_offsets.setdefault(value, offset)
+        
+        for value, offset in first_offsets.items():
+            self.postings.setdefault(value, []).append((file_id, offset))
+        
+        self.files.append(ReferenceFile(path=path, size=size, fingerprint_count=len(first_offsets),
+                                        content_hash=content_hash, start_line=start_line, end_line=end_line))
+        return file_id
+    
+    def build(self) -> ReferenceIndex:
+        """Sort the postings into flat arrays."""
+        hashes = array('Q', sorted(self.postings))
+        starts = array('Q', [0])
+        posting_files = array('I')
+        posting_offsets = array('I')
+        for value in hashes:
+            for file_id, offset in self.postings[value]:
+                posting_files.append(file_id)
+                posting_offsets.append(offset)
+            starts.append(len(posting_files))
+        
+        return ReferenceIndex(self.files, hashes, starts, posting_files, posting_offsets, params=self.params)
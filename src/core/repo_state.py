@@ -0,0 +1,63 @@
+"""
+Per-repository state persisted between analysis runs.
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .config import config
+from .models import RepositoryInfo, RepositoryState, TeamAnalysisResult
+
+logger = logging.getLogger(__name__)
+
+
+class RepositoryStateStore:
+    """Stores the last seen head SHA, commit history and result per repository.
+    
+    Each repository gets one JSON file under ``state_dir``, written
+    atomically so an interrupted run never leaves a truncated state behind.
+    """
+    
+    def __init__(self, state_dir: Optional[str] = None):
+        self.state_dir = Path(state_dir or config.analysis.state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, repo_url: str) -> Path:
+        """State file for a repository URL."""
+        digest = hashlib.sha1(repo_url.encode()).hexdigest()[:16]
+        name = repo_url.rstrip('/').split('/')[-1] or "repo"
+        return self.state_dir / f"{name}-{digest}.json"
+    
+    def load(self, repo_url: str) -> Optional[RepositoryState]:
+        """Load the saved state for a repository, if any."""
+        path = self._path(repo_url)
+        if not path.exists():
+            return None
+        
+        try:
+            return RepositoryState.model_validate_json(path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable state for {repo_url}: {e}")
+            return None
+    
+    def save(self, repo_url: str, repository_info: RepositoryInfo, result: Optional[TeamAnalysisResult] = None):
+        """Persist the latest history and result for a repository."""
+        if not repository_info.commits:
+            return
+        
+        state = RepositoryState(
+            repository_url=repo_url,
+            # Every backend lists history newest first, starting at HEAD.
+            head_sha=repository_info.commits[0].sha,
+            repository_info=repository_info,
+            result=result,
+            updated_at=datetime.now()
+        )
+        
+        path = self._path(repo_url)
+        tmp_path = path.with_suffix('.json.tmp')
+        tmp_path.write_text(state.model_dump_json(), encoding='utf-8')
+        os.replace(tmp_path, path)
@@ -0,0 +1,54 @@
+"""
+Parallel team scheduler with ordered result delivery.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class TeamScheduler:
+    """Run per-team coroutines with bounded parallelism.
+    
+    Up to ``workers`` teams are processed at once. Outcomes are handed to
+    ``on_result`` strictly in input order as soon as every earlier team has
+    finished, so logs and reports are deterministic regardless of which
+    team completes first. A failing team yields its exception as the outcome.
+    """
+    
+    def __init__(self, workers: int = 1):
+        if workers <= 0:
+            raise ValueError("Number of workers must be positive")
+        self.workers = workers
+    
+    def run(self, items: Sequence[Any], task: Callable[[int, Any], Awaitable[Any]],
+            on_result: Callable[[int, Any, Any], None]) -> List[Any]:
+        """Process all items and return their outcomes in input order."""
+        return asyncio.run(self.run_async(items, task, on_result))
+    
+    async def run_async(self, items: Sequence[Any], task: Callable[[int, Any], Awaitable[Any]],
+                        on_result: Callable[[int, Any, Any], None]) -> List[Any]:
+        """Async variant of run for callers already inside an event loop."""
+        semaphore = asyncio.Semaphore(self.workers)
+        outcomes: List[Any] = [None] * len(items)
+        finished = [False] * len(items)
+        next_to_report = 0
+        
+        def report_ready():
+            nonlocal next_to_report
+            while next_to_report < len(items) and finished[next_to_report]:
+                on_result(next_to_report, items[next_to_report], outcomes[next_to_report])
+                next_to_report += 1
+        
+        async def worker(index: int, item: Any):
+            async with semaphore:
+                try:
+                    outcomes[index] = await task(index, item)
+                except Exception as e:
+                    outcomes[index] = e
+            finished[index] = True
+            report_ready()
+        
+        await asyncio.gather(*(worker(i, item) for i, item in enumerate(items)))
+        return outcomes
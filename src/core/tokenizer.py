@@ -0,0 +1,200 @@
+"""
+Single-pass lexers that turn source code into normalized token streams.
+"""
+import builtins
+import io
+import keyword
+import re
+import tokenize
+from typing import List, Optional
+
+IDENTIFIER = "ID"
+STRING = "STR"
+NUMBER = "NUM"
+INDENT = "INDENT"
+DEDENT = "DEDENT"
+
+PYTHON_EXTENSIONS = {'.py', '.pyw'}
+# Languages where '#' starts a line comment rather than a directive or selector.
+HASH_COMMENT_EXTENSIONS = {'.rb', '.php'}
+# Stylesheets and markup: braces there open rule sets, not functions or classes.
+NO_BLOCK_EXTENSIONS = {'.css', '.scss', '.less', '.html'}
+
+PYTHON_KEEP = set(keyword.kwlist) | set(getattr(keyword, 'softkwlist', [])) | set(dir(builtins))
+
+C_FAMILY_KEYWORDS = {
+    'abstract', 'as', 'async', 'await', 'bool', 'boolean', 'break', 'byte', 'case', 'catch', 'chan',
+    'char', 'class', 'const', 'continue', 'def', 'default', 'defer', 'delete', 'do', 'double', 'elif',
+    'else', 'elsif', 'end', 'enum', 'export', 'extends', 'extern', 'false', 'final', 'finally', 'float',
+    'fn', 'for', 'foreach', 'from', 'fun', 'func', 'function', 'go', 'goto', 'if', 'impl', 'implements',
+    'import', 'in', 'instanceof', 'int', 'interface', 'let', 'long', 'loop', 'map', 'match', 'mod',
+    'module', 'mut', 'namespace', 'new', 'nil', 'null', 'object', 'of', 'override', 'package', 'private',
+    'protected', 'pub', 'public', 'range', 'return', 'self', 'short', 'signed', 'sizeof', 'static',
+    'string', 'struct', 'super', 'switch', 'this', 'throw', 'throws', 'trait', 'true', 'try', 'type',
+    'typedef', 'typeof', 'undefined', 'union', 'unless', 'unsigned', 'use', 'using', 'val', 'var',
+    'void', 'where', 'while', 'yield'
+}
+
+# Statements that only pull in other code; dropping them keeps boilerplate
+# import blocks from dominating small files.
+C_FAMILY_IMPORTS = {'import', 'package', 'using', 'require_once', 'include_once'}
+
+_C_FAMILY_RULES = [
+    ('directive', r'^[ \t]*\#[ \t]*(?:include|import)\b[^\n]*'),
+    ('comment', r'//[^\n]*|/\*.*?(?:\*/|\Z)'),
+    ('template', r'`(?:\\.|[^`\\])*`?'),
+    ('string', r'"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?'),
+    ('number', r'\d[\w.]*|\.\d[\w]*'),
+    ('name', r'[A-Za-z_$][\w$]*'),
+    ('newline', r'\n'),
+    ('space', r'[ \t\r\f\v]+'),
+    ('op', r'===|!==|==|!=|<=|>=|&&|\|\||\+\+|--|->|=>|::|<<|>>|\+=|-=|\*=|/=|\S'),
+]
+
+
+def _compile_lexer(hash_comments: bool):
+    """Build the alternation regex for the C-family lexer."""
+    rules = list(_C_FAMILY_RULES)
+    if hash_comments:
+        rules.insert(1, ('hash_comment', r'\#[^\n]*'))
+    pattern = '|'.join(f'(?P<{name}>{regex})' for name, regex in rules)
+    return re.compile(pattern, re.DOTALL | re.MULTILINE)
+
+
+C_FAMILY_LEXER = _compile_lexer(hash_comments=False)
+HASH_COMMENT_LEXER = _compile_lexer(hash_comments=True)
+
+
+def file_extension(path: Optional[str]) -> str:
+    """Lower-cased file extension of a path, including the dot."""
+    if not path or '.' not in path.rsplit('/', 1)[-1]:
+        return ''
+    return '.' + path.rsplit('.', 1)[-1].lower()
+
+
+def tokenize_code(content: str, path: Optional[str] = None) -> List[str]:
+    """Normalized token stream for a source file.
+    
+    Comments, whitespace, docstrings and import statements are dropped.
+    Identifiers become ``ID`` and literals ``STR``/``NUM``, so renaming
+    variables does not change the stream; keywords, builtins and operators
+    are kept. Python files (or files of unknown type that parse as Python)
+    use the standard ``tokenize`` module; everything else goes through a
+    generic C-family lexer.
+    """
+    extension = file_extension(path)
+    if extension in PYTHON_EXTENSIONS or not extension:
+        try:
+            return tokenize_python(content)
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            pass
+    return tokenize_c_family(content, hash_comments=extension in HASH_COMMENT_EXTENSIONS)
+
+
+def tokenize_python(content: str) -> List[str]:
+    """Normalize Python source with the standard library tokenizer."""
+    raw = [
+        token for token in tokenize.generate_tokens(io.StringIO(content).readline)
+        if token.type not in (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER)
+    ]
+    fstring_start = getattr(tokenize, 'FSTRING_START', None)
+    fstring_end = getattr(tokenize, 'FSTRING_END', None)
+    
+    tokens = []
+    line_start = True
+    skip_line = False
+    fstring_depth = 0
+    for i, token in enumerate(raw):
+        if token.type == tokenize.NEWLINE:
+            line_start = True
+            skip_line = False
+            continue
+        
+        if fstring_depth:
+            # Python 3.12+ splits f-strings into parts; the whole f-string is one literal.
+            if token.type == fstring_start:
+                fstring_depth += 1
+            elif token.type == fstring_end:
+                fstring_depth -= 1
+            continue
+        
+        starts_line = line_start
+        line_start = False
+        if skip_line:
+            continue
+        
+        if token.type == tokenize.INDENT:
+            tokens.append(INDENT)
+            line_start = True
+        elif token.type == tokenize.DEDENT:
+            tokens.append(DEDENT)
+            line_start = True
+        elif starts_line and token.type == tokenize.NAME and token.string in ('import', 'from'):
+            skip_line = True
+        elif token.type == tokenize.STRING:
+            is_docstring = starts_line and (i + 1 == len(raw) or raw[i + 1].type == tokenize.NEWLINE)
+            if not is_docstring:
+                tokens.append(STRING)
+        elif token.type == fstring_start:
+            fstring_depth = 1
+            tokens.append(STRING)
+        elif token.type == tokenize.NUMBER:
+            tokens.append(NUMBER)
+        elif token.type == tokenize.NAME:
+            tokens.append(token.string if token.string in PYTHON_KEEP else IDENTIFIER)
+        else:
+            tokens.append(token.string)
+    
+    return tokens
+
+
+def tokenize_c_family(content: str, hash_comments: bool = False) -> List[str]:
+    """Normalize C, Java, JavaScript, Go and similar sources in one regex scan."""
+    lexer = HASH_COMMENT_LEXER if hash_comments else C_FAMILY_LEXER
+    
+    tokens = []
+    statement_start = True
+    skip_statement = False
+    skip_depth = 0
+    for match in lexer.finditer(content):
+        kind = match.lastgroup
+        text = match.group()
+        
+        if kind in ('space', 'comment', 'hash_comment', 'directive'):
+            continue
+        
+        if kind == 'newline':
+            # Imports without a trailing semicolon (Go, Kotlin, Swift, JS) end at
+            # the newline, unless a brace or parenthesis list is still open.
+            if skip_statement and skip_depth == 0:
+                skip_statement = False
+            statement_start = not skip_statement
+            continue
+        
+        if skip_statement:
+            if text in ('{', '('):
+                skip_depth += 1
+            elif text in ('}', ')'):
+                skip_depth = max(skip_depth - 1, 0)
+            elif text == ';' and skip_depth == 0:
+                skip_statement = False
+                statement_start = True
+            continue
+        
+        if statement_start and kind == 'name' and text in C_FAMILY_IMPORTS:
+            skip_statement = True
+            skip_depth = 0
+            continue
+        
+        if kind in ('string', 'template'):
+            tokens.append(STRING)
+        elif kind == 'number':
+            tokens.append(NUMBER)
+        elif kind == 'name':
+            tokens.append(text if text in C_FAMILY_KEYWORDS else IDENTIFIER)
+        else:
+            tokens.append(text)
+        
+        statement_start = text in (';', '{', '}')
+    
+    return tokens
@@ -0,0 +1,27 @@
+"""
+Shared fixtures.
+"""
+import pytest
+
+from src.core.config import config
+from src.core.github_client import GitHubClient
+
+from tests.fakes import FakeGitHub, make_history
+
+
+@pytest.fixture(autouse=True)
+def no_http_cache(monkeypatch):
+    """Keep tests away from the on-disk response cache."""
+    monkeypatch.setattr(config.github, "cache_path", None, raising=False)
+
+
+@pytest.fixture
+def fake_github():
+    return FakeGitHub(make_history(5))
+
+
+@pytest.fixture
+def client(fake_github):
+    client = GitHubClient()
+    client.session = fake_github
+    return client
@@ -0,0 +1,93 @@
+"""
+In-memory GitHub REST API served through a fake ``requests`` session.
+"""
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlencode, urlparse
+
+import requests
+
+REPO_URL = "https://github.com/octo/app"
+START = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_commit(index: int, parents: Optional[List[str]] = None, seconds_before: int = 0) -> Dict:
+    """A commit list item; ``index`` 0 is the newest."""
+    timestamp = START - timedelta(seconds=seconds_before or index * 60)
+    return {
+        'sha': f"{index:040x}",
+        'parents': [{'sha': sha} for sha in (parents or [])],
+        'commit': {
+            'author': {'name': 'alice', 'email': 'alice@example.com',
+                       'date': timestamp.strftime('%Y-%m-%dT%H:%M:%SZ')},
+            'message': f"commit {index}"
+        },
+        'author': {'login': 'alice'}
+    }
+
+
+def make_history(count: int) -> List[Dict]:
+    """A linear history, newest first."""
+    return [make_commit(i, [f"{i + 1:040x}"] if i < count - 1 else []) for i in range(count)]
+
+
+class FakeResponse:
+    """Just enough of ``requests.Response`` for the client."""
+    
+    def __init__(self, status_code: int = 200, body=None, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.raw = io.BytesIO(self.content)
+    
+    def json(self):
+        return json.loads(self.content)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeGitHub:
+    """Serves one repository's REST endpoints from memory and records every request."""
+    
+    def __init__(self, commits: List[Dict]):
+        self.commits = commits
+        self.tarball = b""
+        self.requests: List[tuple] = []
+    
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        path = urlparse(url).path.lstrip('/')
+        params = dict(params or {})
+        self.requests.append((method, path, params))
+        
+        if path.endswith('/tarball'):
+            return FakeResponse(body=self.tarball)
+        if '/commits/' in path:
+            return FakeResponse(body={'stats': {'additions': 10, 'deletions': 2, 'total': 12},
+                                      'files': [{'filename': 'app.py'}]})
+        if path.endswith('/commits'):
+            return self._page(url, self.commits, params)
+        if path.endswith('/contributors'):
+            return self._page(url, [{'login': 'alice'}], params)
+        return FakeResponse(body={'name': 'app', 'owner': {'login': 'octo'}, 'default_branch': 'main',
+                                  'created_at': '2025-01-01T00:00:00Z'})
+    
+    def _page(self, url, items, params):
+        per_page = int(params.get('per_page', 30))
+        page = int(params.get('page', 1))
+        last = max(1, -(-len(items) // per_page))
+        links = []
+        if page < last:
+            links.append(f'<{url}?{urlencode(dict(params, page=page + 1))}>; rel="next"')
+            links.append(f'<{url}?{urlencode(dict(params, page=last))}>; rel="last"')
+        return FakeResponse(body=items[(page - 1) * per_page:page * per_page],
+                            headers={'Link': ', '.join(links)} if links else {})
@@ -0,0 +1,55 @@
+"""
+Tests for the shared blob store.
+"""
+from src.core.blob_store import BlobStore, git_blob_sha, load_boilerplate_blobs
+
+
+def record(path, content):
+    return {"path": path, "content": content, "size": len(content),
+            "sha": git_blob_sha(content.encode()), "lines": content.count("\n") + 1}
+
+
+def test_git_blob_sha_matches_git():
+    # `echo hello | git hash-object --stdin`
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_stored_record_is_relabelled_with_the_new_path():
+    store = BlobStore()
+    stored = store.put(record("team1/App.js", "export default 1\n"))
+    
+    reused = store.get(stored["sha"], "team2/src/App.js")
+    
+    assert reused["path"] == "team2/src/App.js"
+    assert reused["content"] == stored["content"]
+    assert store.hits == 1
+    assert store.get(git_blob_sha(b"other"), "x.js") is None
+
+
+def test_store_evicts_least_recently_used_past_its_size():
+    store = BlobStore(max_bytes=20)
+    a, b, c = (record(f"{name}.py", name * 8) for name in "abc")
+    store.put(a)
+    store.put(b)
+    store.get(a["sha"], "a.py")
+    store.put(c)
+    
+    assert len(store) == 2 and store.size == 16
+    assert store.get(b["sha"], "b.py") is None
+    assert store.get(a["sha"], "a.py") is not None
+    
+    store.put(record("big.py", "x" * 21))
+    assert len(store) == 2
+
+
+def test_boilerplate_list_reads_shas_and_hashes_template_files(tmp_path):
+    template = tmp_path / "template"
+    template.mkdir()
+    (template / "index.js").write_bytes(b"render()\n")
+    allow_list = tmp_path / "boilerplate.txt"
+    allow_list.write_text(f"# stock files\n{'a' * 40}\ntemplate\nmissing\n")
+    
+    assert load_boilerplate_blobs(str(allow_list)) == {"a" * 40, git_blob_sha(b"render()\n")}
+    store = BlobStore({"a" * 40})
+    assert store.is_boilerplate("a" * 40) and not store.is_boilerplate("b" * 40)
+    assert store.skipped == 1
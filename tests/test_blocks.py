@@ -0,0 +1,79 @@
+"""
+Tests for function and class block extraction.
+"""
+from src.core.blocks import extract_blocks
+
+
+def spans(content, path):
+    return [(b.kind, b.name, b.start_line, b.end_line) for b in extract_blocks(content, path)]
+
+
+def test_semicolon_free_javascript_statements_do_not_merge():
+    content = (
+        "const express = require('express')\n"
+        "const app = express()\n"
+        "\n"
+        "app.get('/', (req, res) => {\n"
+        "  res.send('hello world from the express application server')\n"
+        "})\n"
+    )
+    assert spans(content, "server.js") == [("function", "get", 4, 6)]
+
+
+def test_go_func_after_multiline_import_starts_at_func():
+    content = (
+        "package main\n"
+        "import (\n"
+        "\t\"fmt\"\n"
+        ")\n"
+        "func main() {\n"
+        "\tfmt.Println(\"hello world from the go program and some more\")\n"
+        "}\n"
+    )
+    assert spans(content, "main.go") == [("function", "main", 5, 7)]
+
+
+def test_multiline_signature_starts_at_declaration():
+    content = (
+        "func add(\n"
+        "\ta int,\n"
+        "\tb int,\n"
+        ") int {\n"
+        "\treturn a + b + 1000000000000000000 + 2000000000000000\n"
+        "}\n"
+    )
+    assert spans(content, "add.go") == [("function", "add", 1, 6)]
+
+
+def test_brace_on_its_own_line():
+    content = (
+        "public class Program\n"
+        "{\n"
+        "    public static void Main(string[] args)\n"
+        "    {\n"
+        "        Console.WriteLine(\"hello world from csharp program text\");\n"
+        "    }\n"
+        "}\n"
+    )
+    assert spans(content, "Program.cs") == [("function", "Main", 3, 6)]
+
+
+def test_python_blocks_use_ast_and_include_decorators():
+    content = (
+        "import functools\n"
+        "\n"
+        "@functools.lru_cache\n"
+        "def expensive(value):\n"
+        "    return sum(range(value)) + len(str(value)) * 1000\n"
+    )
+    assert spans(content, "util.py") == [("function", "expensive", 3, 5)]
+
+
+def test_stylesheet_at_rules_are_not_functions():
+    content = (
+        "@media (max-width: 600px) {\n"
+        "  .container { padding: 0 16px; margin: 0 auto; max-width: 100%; }\n"
+        "}\n"
+    )
+    for path in ("style.css", "style.scss", "style.less"):
+        assert spans(content, path) == []
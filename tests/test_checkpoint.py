@@ -0,0 +1,48 @@
+"""
+Tests for the append-only checkpoint store.
+"""
+from datetime import datetime, timezone
+
+from src.core.checkpoint import CheckpointStore
+from src.core.models import RepositoryInfo, Team, TeamAnalysisResult
+
+
+def result(team_id, summary="ok"):
+    team = Team(team_id=team_id, team_name=f"Team {team_id}", members=[],
+                repository_url=f"https://github.com/{team_id}/app")
+    info = RepositoryInfo(url=f"https://github.com/{team_id}/app", name="app", owner=team_id,
+                          created_at=datetime(2025, 1, 1, tzinfo=timezone.utc), commits=[], contributors=[])
+    return TeamAnalysisResult(team=team, repository_info=info, violations=[], is_flagged=False,
+                              summary=summary, analysis_timestamp=datetime(2025, 3, 1, tzinfo=timezone.utc))
+
+
+def test_load_returns_appended_results_and_last_record_wins(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoint.jsonl"))
+    store.reset()
+    store.append(result("a", "first"))
+    store.append(result("b"))
+    store.append(result("a", "second"))
+    
+    loaded = store.load()
+    assert sorted(loaded) == ["a", "b"]
+    assert loaded["a"].summary == "second"
+
+
+def test_truncated_last_line_is_skipped_and_terminated(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    store = CheckpointStore(str(path))
+    store.reset()
+    store.append(result("a"))
+    line = result("b").model_dump_json()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[:len(line) // 2])
+    
+    assert sorted(store.load()) == ["a"]
+    
+    # Records appended after a crash start on a fresh line.
+    store.append(result("c"))
+    assert sorted(CheckpointStore(str(path)).load()) == ["a", "c"]
+
+
+def test_missing_checkpoint_loads_empty(tmp_path):
+    assert CheckpointStore(str(tmp_path / "none.jsonl")).load() == {}
@@ -0,0 +1,105 @@
+"""
+Tests for the columnar commit view.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+from src.core.commit_store import MICROSECONDS_PER_SECOND, CommitColumns
+from src.core.models import CommitInfo
+
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def commit(offset_seconds, index=0, author="alice"):
+    return CommitInfo(sha=f"{index:040x}", author=author, author_email=f"{author}@example.com",
+                      timestamp=START + timedelta(seconds=offset_seconds), message="m",
+                      additions=1, deletions=0, total_changes=1, files_changed=1)
+
+
+def test_columns_intern_authors_and_order_by_time():
+    commits = [commit(30, 0), commit(10, 1, author="bob"), commit(10, 2), commit(20, 3)]
+    columns = CommitColumns(commits)
+    assert len(columns) == 4
+    assert columns.authors == [("alice", "alice@example.com"), ("bob", "bob@example.com")]
+    assert columns.author_ids.tolist() == [0, 1, 0, 0]
+    # Ties keep input order.
+    assert columns.order.tolist() == [1, 2, 3, 0]
+    assert [c.sha for c in columns.rows(columns.order[:2])] == [commits[1].sha, commits[2].sha]
+
+
+def test_identical_timestamps_are_listed_by_first_row():
+    columns = CommitColumns([commit(offset, i) for i, offset in enumerate([7, 3, 7, 3, 5])])
+    assert columns.identical_timestamps() == [(0, 2), (1, 2)]
+    assert columns.identical_timestamps(3) == []
+    assert CommitColumns([]).identical_timestamps() == []
+
+
+def test_identical_timestamps_match_walking_the_commits():
+    rng = random.Random(6)
+    for _ in range(50):
+        offsets = [rng.randint(0, 20) for _ in range(rng.randint(0, 30))]
+        groups = {}
+        for row, offset in enumerate(offsets):
+            groups.setdefault(offset, []).append(row)
+        expected = [(rows[0], len(rows)) for rows in groups.values() if len(rows) >= 2]
+        
+        columns = CommitColumns([commit(offset, i) for i, offset in enumerate(offsets)])
+        assert columns.identical_timestamps() == expected
+
+
+def test_columns_consume_a_generator_once_and_call_hooks():
+    seen = []
+    columns = CommitColumns((commit(i, i, author="bob" if i % 2 else "alice") for i in range(4)),
+                            hooks=[lambda row, c: seen.append(row)])
+    assert seen == [0, 1, 2, 3]
+    assert len(columns) == 4
+    assert columns.authors == [("alice", "alice@example.com"), ("bob", "bob@example.com")]
+    assert columns.author_ids.tolist() == [0, 1, 0, 1]
+
+
+def brute_force_bursts(timestamps, window, min_commits):
+    """Merge every min_commits-run that fits inside the window."""
+    ordered = sorted(timestamps)
+    bursts = []
+    for start in range(len(ordered) - min_commits + 1):
+        last = start + min_commits - 1
+        if ordered[last] - ordered[start] >= window:
+            continue
+        if bursts and start <= bursts[-1][1]:
+            bursts[-1] = (bursts[-1][0], last)
+        else:
+            bursts.append((start, last))
+    return bursts
+
+
+def test_bursts_match_brute_force():
+    rng = random.Random(5)
+    for _ in range(100):
+        offsets = [rng.randint(0, 600) for _ in range(rng.randint(0, 40))]
+        columns = CommitColumns([commit(offset, i) for i, offset in enumerate(offsets)])
+        window = rng.choice([10, 30, 60]) * MICROSECONDS_PER_SECOND
+        min_commits = rng.randint(2, 5)
+        expected = brute_force_bursts(columns.timestamps.tolist(), window, min_commits)
+        assert columns.bursts(window, min_commits) == expected
+
+
+def test_bursts_window_is_exclusive():
+    columns = CommitColumns([commit(0, 0), commit(30, 1), commit(60, 2)])
+    assert columns.bursts(60 * MICROSECONDS_PER_SECOND, 3) == []
+    assert columns.bursts(61 * MICROSECONDS_PER_SECOND, 3) == [(0, 2)]
+
+
+def test_bursts_merge_overlapping_runs_and_split_gaps():
+    offsets = [0, 10, 20, 30, 1000, 1005, 1010]
+    columns = CommitColumns([commit(offset, i) for i, offset in enumerate(reversed(offsets))])
+    assert columns.bursts(25 * MICROSECONDS_PER_SECOND, 3) == [(0, 3), (4, 6)]
+    # Positions index the time-sorted order, not the input order.
+    first, last = columns.bursts(25 * MICROSECONDS_PER_SECOND, 3)[0]
+    assert [c.timestamp for c in columns.rows(columns.order[first:last + 1])] == [
+        START + timedelta(seconds=s) for s in offsets[:4]
+    ]
+
+
+def test_bursts_with_too_few_commits():
+    assert CommitColumns([commit(0)]).bursts(MICROSECONDS_PER_SECOND, 2) == []
+    assert CommitColumns([]).bursts(MICROSECONDS_PER_SECOND, 2) == []
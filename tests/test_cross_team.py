@@ -0,0 +1,83 @@
+"""
+Tests for MinHash signatures and cross-team matching.
+"""
+import random
+
+from src.core.cross_team import CrossTeamDetector, minhash_signature
+from src.core.models import CodeFileFingerprints, Team
+
+
+def random_set(rng, size):
+    return {rng.getrandbits(64) for _ in range(size)}
+
+
+def team(index):
+    return Team(team_id=f"t{index}", team_name=f"Team {index}", members=[],
+                repository_url=f"https://github.com/team{index}/app")
+
+
+def agreement(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def test_minhash_signature_shape_and_determinism():
+    rng = random.Random(1)
+    values = random_set(rng, 300)
+    signature = minhash_signature(values, 128)
+    assert len(signature) == 128
+    assert signature == minhash_signature(sorted(values), 128)
+    assert minhash_signature(set(), 128) is None
+
+
+def test_minhash_signature_estimates_jaccard():
+    rng = random.Random(2)
+    shared = random_set(rng, 600)
+    a = shared | random_set(rng, 200)
+    b = shared | random_set(rng, 200)
+    true_jaccard = len(a & b) / len(a | b)
+    estimate = agreement(minhash_signature(a, 128), minhash_signature(b, 128))
+    assert abs(estimate - true_jaccard) < 0.15
+    
+    unrelated = agreement(minhash_signature(a, 128), minhash_signature(random_set(rng, 800), 128))
+    assert unrelated < 0.1
+
+
+def test_minhash_signature_fills_empty_bins():
+    signature = minhash_signature({42}, 64)
+    assert None not in signature
+    # Borrowed values are offset by their distance, so they never repeat.
+    assert len(set(signature)) == 64
+
+
+def test_detector_reports_copied_file_for_both_teams():
+    rng = random.Random(3)
+    copied = sorted(random_set(rng, 80))
+    detector = CrossTeamDetector()
+    detector.add_files(team(0), [CodeFileFingerprints(path="server.js", fingerprints=copied)])
+    detector.add_files(team(1), [CodeFileFingerprints(path="api/server.js", fingerprints=copied)])
+    detector.add_files(team(2), [CodeFileFingerprints(path="main.js", fingerprints=sorted(random_set(rng, 80)))])
+    
+    violations = detector.violations()
+    assert set(violations) == {"t0", "t1"}
+    assert violations["t0"][0].evidence["other_file_path"] == "api/server.js"
+    assert violations["t0"][0].severity == "high"
+
+
+def test_detector_ignores_code_shared_by_many_teams():
+    rng = random.Random(4)
+    boilerplate = sorted(random_set(rng, 80))
+    detector = CrossTeamDetector(max_shared_teams=3)
+    for index in range(5):
+        detector.add_files(team(index), [
+            CodeFileFingerprints(path="src/App.js", fingerprints=boilerplate),
+            CodeFileFingerprints(path="src/main.js", fingerprints=sorted(random_set(rng, 80))),
+        ])
+    assert detector.violations() == {}
+
+
+def test_detector_skips_tiny_files():
+    detector = CrossTeamDetector()
+    tiny = [1, 2, 3]
+    detector.add_files(team(0), [CodeFileFingerprints(path="a.js", fingerprints=tiny)])
+    detector.add_files(team(1), [CodeFileFingerprints(path="b.js", fingerprints=tiny)])
+    assert detector.files == []
@@ -0,0 +1,83 @@
+"""
+Tests for k-gram hashing and winnowing.
+"""
+import random
+
+from src.core.fingerprint import (
+    MASK_64, ROLLING_BASE, fingerprint_set, fingerprint_tokens, kgram_hashes, token_hash, winnow
+)
+
+
+def direct_kgram_hash(tokens, start, k):
+    """Polynomial hash of one window, computed from scratch."""
+    value = 0
+    for token in tokens[start:start + k]:
+        value = (value * ROLLING_BASE + token_hash(token)) & MASK_64
+    return value
+
+
+def brute_force_winnow(hashes, window):
+    """Rightmost minimum of every window, recording each position once."""
+    selected = []
+    for start in range(len(hashes) - window + 1):
+        span = range(start, start + window)
+        position = min(span, key=lambda i: (hashes[i], -i))
+        if not selected or selected[-1][1] != position:
+            selected.append((hashes[position], position))
+    return selected
+
+
+def test_kgram_hashes_match_direct_computation():
+    tokens = [f"t{i % 7}" for i in range(50)]
+    hashes = kgram_hashes(tokens, 5)
+    assert len(hashes) == len(tokens) - 5 + 1
+    assert hashes == [direct_kgram_hash(tokens, i, 5) for i in range(len(hashes))]
+
+
+def test_kgram_hashes_depend_only_on_window_contents():
+    tokens = "a b c d a b c d".split()
+    hashes = kgram_hashes(tokens, 4)
+    assert hashes[0] == hashes[4]
+    assert len(set(hashes[:4])) == 4
+
+
+def test_kgram_hashes_shorter_than_k():
+    assert kgram_hashes(["a", "b"], 3) == []
+    assert kgram_hashes([], 1) == []
+
+
+def test_winnow_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        hashes = [rng.randrange(16) for _ in range(rng.randint(5, 60))]
+        window = rng.randint(1, 6)
+        if len(hashes) <= window:
+            continue
+        assert winnow(hashes, window) == brute_force_winnow(hashes, window)
+
+
+def test_winnow_covers_every_window():
+    rng = random.Random(3)
+    hashes = [rng.getrandbits(64) for _ in range(500)]
+    positions = {position for _, position in winnow(hashes, 4)}
+    for start in range(len(hashes) - 4 + 1):
+        assert positions & set(range(start, start + 4))
+
+
+def test_winnow_short_input_picks_rightmost_minimum():
+    assert winnow([5, 1, 3, 1], 4) == [(1, 3)]
+    assert winnow([], 4) == []
+
+
+def test_fingerprint_tokens_short_stream_gets_one_fingerprint():
+    fingerprints = fingerprint_tokens(["x", "=", "1"], k=8)
+    assert fingerprints == [(kgram_hashes(["x", "=", "1"], 3)[0], 0)]
+
+
+def test_shared_code_shares_fingerprints():
+    shared = [f"tok{i}" for i in range(60)]
+    a = fingerprint_set(fingerprint_tokens(["intro"] * 3 + shared))
+    b = fingerprint_set(fingerprint_tokens(shared + ["outro"] * 3))
+    unrelated = fingerprint_set(fingerprint_tokens([f"other{i}" for i in range(60)]))
+    assert len(a & b) / len(a | b) > 0.6
+    assert not a & unrelated
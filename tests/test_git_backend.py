@@ -0,0 +1,136 @@
+"""
+Tests for the local git clone backend.
+"""
+import subprocess
+
+import pytest
+
+from src.core import git_backend
+from src.core.blob_store import git_blob_sha
+from src.core.git_backend import FIELD_SEPARATOR, RECORD_SEPARATOR, GitBackendError, LocalGitBackend
+
+
+def log_record(sha, message, numstat):
+    fields = [sha, "Alice", "12345+alice@users.noreply.github.com", "2025-03-01T12:00:00+00:00", message]
+    return RECORD_SEPARATOR + FIELD_SEPARATOR.join(fields) + FIELD_SEPARATOR + numstat
+
+
+def test_parse_log_sums_numstat_and_skips_binary_counts(tmp_path):
+    output = (log_record("a" * 40, "Add app\n\nWith a body\n", "\n10\t2\tapp.py\n-\t-\tlogo.png\n3\t0\tREADME.md\n")
+              + log_record("b" * 40, "Initial commit\n", "\n"))
+    
+    commits = LocalGitBackend(clone_dir=str(tmp_path)).parse_log(output)
+    
+    assert [c.sha for c in commits] == ["a" * 40, "b" * 40]
+    assert commits[0].message == "Add app\n\nWith a body"
+    assert (commits[0].additions, commits[0].deletions, commits[0].files_changed) == (13, 2, 3)
+    assert commits[0].total_changes == 15
+    assert commits[1].files_changed == 0
+
+
+def test_analyze_local_repository(tmp_path):
+    source = tmp_path / "app"
+    source.mkdir()
+    
+    def git(*args):
+        subprocess.run(["git", "-C", str(source), *args], check=True, capture_output=True)
+    
+    git("init", "-q")
+    git("config", "user.name", "Alice")
+    git("config", "user.email", "12345+alice@users.noreply.github.com")
+    (source / "app.py").write_text("print('one')\nprint('two')\n")
+    git("add", "app.py")
+    git("commit", "-q", "-m", "First")
+    (source / "app.py").write_text("print('one')\n")
+    git("commit", "-q", "-am", "Second")
+    
+    backend = LocalGitBackend(clone_dir=str(tmp_path / "clones"))
+    repository = backend.analyze_repository(str(source))
+    
+    assert repository.name == "app"
+    assert repository.contributors == ["alice"]
+    assert [c.message for c in repository.commits] == ["Second", "First"]
+    assert [(c.additions, c.deletions) for c in repository.commits] == [(0, 1), (2, 0)]
+    
+    # A second run fetches into the existing bare clone.
+    git("commit", "-q", "--allow-empty", "-m", "Third")
+    assert len(backend.analyze_repository(str(source)).commits) == 3
+
+
+def test_code_files_are_read_from_the_clone(tmp_path):
+    source = tmp_path / "app"
+    (source / "src").mkdir(parents=True)
+    (source / "node_modules" / "lib").mkdir(parents=True)
+    (source / "src" / "app.py").write_text("def main():\n    return 1\n")
+    (source / "src" / "web.js").write_text("export const x = 1\n")
+    (source / "src" / "blob.js").write_bytes(b"\xff\xfe\x00binary")
+    (source / "node_modules" / "lib" / "index.js").write_text("module.exports = 1\n")
+    (source / "README.md").write_text("# App\n")
+    for args in (["init", "-q"], ["add", "."],
+                 ["-c", "user.name=A", "-c", "user.email=a@example.com", "commit", "-q", "-m", "First"]):
+        subprocess.run(["git", "-C", str(source), *args], check=True, capture_output=True)
+    
+    backend = LocalGitBackend(clone_dir=str(tmp_path / "clones"))
+    repository = backend.analyze_repository(str(source))
+    # The analyzer passes the file:// URL from RepositoryInfo; it maps to the same clone.
+    files = backend.get_code_files(str(repository.url))
+    
+    assert sorted(f["path"] for f in files) == ["src/app.py", "src/web.js"]
+    app = next(f for f in files if f["path"] == "src/app.py")
+    assert app["content"] == "def main():\n    return 1\n"
+    assert app["sha"] == git_blob_sha(app["content"].encode())
+    assert len(list((tmp_path / "clones").iterdir())) == 1
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalGitBackend(clone_dir=str(tmp_path))
+    backend.token = "secret-token"
+    return backend
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    recorded = []
+    
+    def run(command, **kwargs):
+        recorded.append((command, kwargs))
+        return subprocess.CompletedProcess(command, 0, stdout=b"", stderr=b"")
+    
+    monkeypatch.setattr(git_backend.subprocess, "run", run)
+    return recorded
+
+
+def test_token_only_sent_to_github_through_environment(backend, calls):
+    backend._git("ls-remote", "https://github.com/octo/app", "HEAD", remote="https://github.com/octo/app")
+    command, kwargs = calls[-1]
+    env = kwargs["env"]
+    assert "secret-token" not in " ".join(command)
+    assert env["GIT_CONFIG_KEY_0"] == "http.https://github.com/.extraHeader"
+    assert env["GIT_CONFIG_VALUE_0"] == "Authorization: Bearer secret-token"
+    assert env["GIT_TERMINAL_PROMPT"] == "0"
+    
+    backend._git("ls-remote", "https://gitlab.com/octo/app", "HEAD", remote="https://gitlab.com/octo/app")
+    env = calls[-1][1]["env"]
+    assert "secret-token" not in " ".join(env.values())
+    assert env["GIT_TERMINAL_PROMPT"] == "0"
+
+
+def test_existing_git_config_entries_are_kept(backend, calls, monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    monkeypatch.setenv("GIT_CONFIG_KEY_0", "core.autocrlf")
+    monkeypatch.setenv("GIT_CONFIG_VALUE_0", "false")
+    backend._git("fetch", remote="https://github.com/octo/app")
+    env = calls[-1][1]["env"]
+    assert env["GIT_CONFIG_COUNT"] == "2"
+    assert env["GIT_CONFIG_KEY_0"] == "core.autocrlf"
+    assert env["GIT_CONFIG_KEY_1"] == "http.https://github.com/.extraHeader"
+
+
+def test_timeout_raises_backend_error(backend, monkeypatch):
+    def run(command, **kwargs):
+        raise subprocess.TimeoutExpired(command, kwargs["timeout"])
+    
+    monkeypatch.setattr(git_backend.subprocess, "run", run)
+    with pytest.raises(GitBackendError, match="timed out"):
+        backend._git("fetch", remote="https://github.com/octo/app")
@@ -0,0 +1,312 @@
+"""
+Tests for the REST and GraphQL GitHub client against an in-memory API.
+"""
+import asyncio
+import io
+import re
+import tarfile
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import pytest
+
+from src.core.async_github_client import AsyncGitHubClient
+from src.core.blob_store import git_blob_sha
+from src.core.github_client import GitHubClient
+from src.core.models import CommitInfo, RepositoryInfo
+from src.core.repo_state import RepositoryStateStore
+
+from tests.fakes import REPO_URL, START, FakeResponse, make_commit, make_history
+
+
+def tarball(files):
+    """A gzipped tarball with GitHub's single top-level directory."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, data in files.items():
+            member = tarfile.TarInfo(f"octo-app-abc123/{path}")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_tarball_yields_code_files_in_one_request(client, fake_github):
+    source = b"def main():\n    return 1\n"
+    fake_github.tarball = tarball({
+        "src/app.py": source,
+        "node_modules/lib/index.js": b"module.exports = 1\n",
+        "README.md": b"# App\n",
+    })
+    
+    files = client.get_code_files_from_tarball(REPO_URL)
+    
+    assert [f["path"] for f in files] == ["src/app.py"]
+    assert files[0]["content"] == source.decode()
+    assert files[0]["sha"] == git_blob_sha(source)
+    assert [path for _, path, _ in fake_github.requests] == ["repos/octo/app/tarball"]
+    # The tarball is downloaded whole anyway; keeping the files would only cost memory.
+    assert len(client.blob_store) == 0
+
+
+def test_tarball_skips_boilerplate_blobs(client, fake_github):
+    boilerplate = b"export default function App() { return null }\n"
+    fake_github.tarball = tarball({"src/App.js": boilerplate, "src/api.js": b"export const x = 1\n"})
+    client.blob_store.boilerplate.add(git_blob_sha(boilerplate))
+    
+    assert [f["path"] for f in client.get_code_files_from_tarball(REPO_URL)] == ["src/api.js"]
+
+
+def test_detail_policies_select_commits(client):
+    commits = make_history(10)
+    client.commit_detail_limit = 3
+    
+    client.commit_detail_policy = "all"
+    assert client._select_detail_indices(commits) == list(range(10))
+    client.commit_detail_policy = "recent"
+    assert client._select_detail_indices(commits) == [0, 1, 2]
+    client.commit_detail_policy = "edges"
+    assert client._select_detail_indices(commits) == [0, 1, 2, 7, 8, 9]
+    client.commit_detail_policy = "window"
+    # Commits 0 and 1 fall after the window's end; 7-9 are the oldest K.
+    window = (START - timedelta(hours=1), START - timedelta(seconds=90))
+    assert client._select_detail_indices(commits, window) == [0, 1, 7, 8, 9]
+
+
+def test_analyze_repository_fetches_details_for_selected_commits(client, fake_github):
+    client.commit_detail_policy = "recent"
+    client.commit_detail_limit = 2
+    
+    info = client.analyze_repository(REPO_URL)
+    
+    assert [c.sha for c in info.commits] == [c["sha"] for c in fake_github.commits]
+    assert [c.additions for c in info.commits] == [10, 10, 0, 0, 0]
+    assert info.contributors == ["alice"]
+
+
+def as_repository(commits_raw, client):
+    commits = [client._build_commit_info(c) for c in commits_raw]
+    return RepositoryInfo(url=REPO_URL, name="app", owner="octo", created_at=START, commits=commits,
+                          contributors=["alice"])
+
+
+def test_new_commits_on_top_of_the_previous_head_are_merged(client):
+    previous = as_repository(make_history(5), client)
+    newer = [make_commit(100, [f"{0:040x}"])] + make_history(5)
+    
+    assert [c["sha"] for c in client._new_commits(previous, newer)] == [f"{100:040x}"]
+
+
+def test_new_commits_with_unknown_parents_need_a_full_fetch(client):
+    previous = as_repository(make_history(5), client)
+    disconnected = [make_commit(100, [f"{999:040x}"])]
+    
+    assert client._new_commits(previous, disconnected) is None
+
+
+def test_amended_head_needs_a_full_fetch(client):
+    history = make_history(5)
+    previous = as_repository(history, client)
+    # The amended commit replaces the old head on top of the same parent.
+    amended = [make_commit(100, [history[1]["sha"]])] + history[1:]
+    
+    assert client._new_commits(previous, amended) is None
+
+
+def test_reset_head_needs_a_full_fetch(client):
+    history = make_history(5)
+    previous = as_repository(history, client)
+    
+    assert client._new_commits(previous, history) == []
+    assert client._new_commits(previous, history[2:]) is None
+    assert client._new_commits(previous, []) is None
+
+
+def test_incremental_analysis_after_a_reset_saves_the_new_head(client, fake_github, tmp_path):
+    previous = client.analyze_repository(REPO_URL)
+    fake_github.commits = fake_github.commits[2:]
+    store = RepositoryStateStore(str(tmp_path))
+    
+    async def analyze():
+        async with AsyncGitHubClient(client) as async_client:
+            return await async_client.analyze_repository(REPO_URL, previous=previous)
+    
+    info = asyncio.run(analyze())
+    store.save(REPO_URL, info)
+    
+    assert [c.sha for c in info.commits] == [c["sha"] for c in fake_github.commits]
+    assert store.load(REPO_URL).head_sha == fake_github.commits[0]["sha"]
+
+
+def test_incremental_analysis_fetches_details_only_for_new_commits(client, fake_github):
+    client.commit_detail_policy = "all"
+    previous = client.analyze_repository(REPO_URL)
+    fake_github.commits = [make_commit(100, [f"{0:040x}"])] + fake_github.commits
+    fake_github.requests.clear()
+    
+    info = client.analyze_repository(REPO_URL, previous=previous)
+    
+    assert [c.sha for c in info.commits] == [c["sha"] for c in fake_github.commits]
+    details = [path for _, path, _ in fake_github.requests if "/commits/" in path]
+    assert details == [f"repos/octo/app/commits/{100:040x}"]
+
+
+@pytest.mark.parametrize("policy", ["all", "recent", "edges", "window"])
+def test_iter_commits_matches_analyze_repository(client, fake_github, policy):
+    fake_github.commits = make_history(250)
+    client.commit_detail_policy = policy
+    client.commit_detail_limit = 20
+    window = (START - timedelta(hours=3), START - timedelta(hours=1))
+    
+    streamed = list(client.iter_commits(REPO_URL, detail_window=window))
+    fetched = client.analyze_repository(REPO_URL, detail_window=window).commits
+    
+    assert [(c.sha, c.additions) for c in streamed] == [(c.sha, c.additions) for c in fetched]
+
+
+def test_stream_repository_is_lazy(client, fake_github):
+    info, stream = client.stream_repository(REPO_URL)
+    assert info.commits == []
+    assert not any(path.endswith("/commits") for _, path, _ in fake_github.requests)
+    assert isinstance(next(stream), CommitInfo)
+
+
+class GraphQLSession:
+    """Answers batched history queries with two pages per repository."""
+    
+    def __init__(self, commits_per_repo=150):
+        self.commits_per_repo = commits_per_repo
+        self.queries = []
+    
+    def request(self, method, url, json=None, **kwargs):
+        self.queries.append(json["query"])
+        data = {}
+        pattern = r'(r\d+): repository\(owner: "([^"]+)", name: "([^"]+)"\)[^$]*?after: (null|"\d+")'
+        for alias, owner, name, cursor in re.findall(pattern, json["query"]):
+            offset = 0 if cursor == "null" else int(cursor.strip('"'))
+            count = min(100, self.commits_per_repo - offset)
+            nodes = [{
+                "oid": f"{name}-{offset + i}", "message": "m", "additions": 3, "deletions": 1,
+                "changedFilesIfAvailable": 1,
+                "author": {"name": "alice", "email": "a@example.com", "date": "2025-03-01T12:00:00Z",
+                           "user": {"login": "alice"}}
+            } for i in range(count)]
+            data[alias] = {
+                "name": name, "createdAt": "2025-01-01T00:00:00Z", "owner": {"login": owner},
+                "defaultBranchRef": {"target": {"history": {
+                    "pageInfo": {"hasNextPage": offset + count < self.commits_per_repo,
+                                 "endCursor": f'{offset + count}'},
+                    "nodes": nodes
+                }}}
+            }
+        return FakeResponse(body={"data": data})
+
+
+def test_graphql_batches_repositories_and_follows_cursors(client):
+    client.session = GraphQLSession()
+    client.graphql_batch_size = 2
+    urls = [f"https://github.com/octo/app{i}" for i in range(3)]
+    
+    results = client.analyze_repositories_graphql(urls)
+    
+    # Two pages for a batch of two repositories, then two for the third.
+    assert len(client.session.queries) == 4
+    assert [q.count("repository(") for q in client.session.queries] == [2, 2, 1, 1]
+    for i, url in enumerate(urls):
+        commits = results[url].commits
+        assert len(commits) == 150
+        assert commits[0].sha == f"app{i}-0" and commits[0].total_changes == 4
+        assert results[url].contributors == ["alice"]
+
+ENDPOINT = "repos/octo/app/commits"
+
+
+class PagedClient(GitHubClient):
+    """Serves ``total`` items from memory with GitHub-style Link headers."""
+    
+    def __init__(self, total, links="last"):
+        super().__init__()
+        self.total = total
+        self.links = links
+        self.requested = []
+        self._requested_lock = threading.Lock()
+    
+    def _make_request_with_headers(self, endpoint, params=None):
+        page, per_page = params["page"], params["per_page"]
+        with self._requested_lock:
+            self.requested.append(page)
+        items = list(range(self.total))[(page - 1) * per_page:page * per_page]
+        last = max(1, -(-self.total // per_page))
+        
+        def link(number, rel):
+            return f'<{self.base_url}/{endpoint}?{urlencode(dict(params, page=number))}>; rel="{rel}"'
+        
+        links = []
+        if page < last and self.links in ("last", "next"):
+            links.append(link(page + 1, "next"))
+        if page < last and self.links == "last":
+            links.append(link(last, "last"))
+        return items, {"Link": ", ".join(links)} if links else {}
+
+
+@pytest.mark.parametrize("links", ["last", "next"])
+@pytest.mark.parametrize("total", [0, 1, 30, 100, 437])
+def test_paginate_yields_every_page_in_order(total, links):
+    client = PagedClient(total, links)
+    pages = list(client._paginate(ENDPOINT, {"per_page": 30}))
+    
+    assert [item for page in pages for item in page] == list(range(total))
+    assert all(pages)
+    # Exactly one request per page, none past the end.
+    assert sorted(client.requested) == list(range(1, max(1, -(-total // 30)) + 1))
+
+
+def test_paginate_without_links_stops_after_first_page():
+    client = PagedClient(100, links=None)
+    pages = list(client._paginate(ENDPOINT, {"per_page": 30}))
+    assert pages == [list(range(30))]
+    assert client.requested == [1]
+
+
+def test_paginate_prefetches_at_most_max_concurrency_pages():
+    client = PagedClient(3000, links="last")
+    pages = client._paginate(ENDPOINT, {"per_page": 30})
+    next(pages)
+    next(pages)
+    time.sleep(0.05)
+    assert len(client.requested) <= 2 + client.max_concurrency
+    pages.close()
+
+
+def test_link_page_reads_page_numbers():
+    client = PagedClient(0)
+    headers = {"Link": f'<{client.base_url}/{ENDPOINT}?per_page=30&page=2>; rel="next", '
+                       f'<{client.base_url}/{ENDPOINT}?per_page=30&page=15>; rel="last"'}
+    assert client._link_page(headers, "next") == 2
+    assert client._link_page(headers, "last") == 15
+    assert client._link_page({}, "last") is None
+
+
+def test_requests_share_one_concurrency_limit(monkeypatch):
+    client = GitHubClient()
+    lock = threading.Lock()
+    in_flight = {"now": 0, "peak": 0}
+    
+    def request(method, url, **kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        time.sleep(0.01)
+        with lock:
+            in_flight["now"] -= 1
+        return FakeResponse()
+    
+    monkeypatch.setattr(client.session, "request", request)
+    threads = [threading.Thread(target=client._send, args=("GET", "https://api.github.com/x")) for _ in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert in_flight["peak"] <= client.max_concurrency
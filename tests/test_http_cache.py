@@ -0,0 +1,60 @@
+"""
+Tests for the on-disk ETag response cache.
+"""
+import pytest
+
+from src.core.github_client import GitHubClient
+from src.core.http_cache import HTTPCache
+
+from tests.fakes import FakeResponse
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(str(tmp_path / "responses.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_key_ignores_parameter_order():
+    assert HTTPCache.make_key("u", {"a": 1, "b": 2}) == HTTPCache.make_key("u", {"b": 2, "a": 1})
+    assert HTTPCache.make_key("u", {"a": 1}) != HTTPCache.make_key("u", {"a": 2})
+
+
+def test_put_and_get_round_trip(cache):
+    response = FakeResponse(body={"id": 1}, headers={"ETag": '"abc"', "Link": '<x>; rel="next"'})
+    assert cache.put("key", "https://api.github.com/x", response)
+    
+    cached = cache.get("key")
+    assert cached.json() == {"id": 1}
+    assert cached.conditional_headers() == {"If-None-Match": '"abc"'}
+    assert cached.headers == {"Link": '<x>; rel="next"'}
+    assert cache.get("missing") is None
+
+
+def test_responses_without_validators_are_not_stored(cache):
+    assert not cache.put("key", "https://api.github.com/x", FakeResponse(body={}))
+    assert not cache.put("key", "https://api.github.com/x", FakeResponse(404, {}, {"ETag": '"x"'}))
+    assert cache.get("key") is None
+
+
+class RevalidatingSession:
+    """Answers with an ETag, then 304 whenever the client revalidates."""
+    
+    def __init__(self):
+        self.sent_headers = []
+    
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return FakeResponse(304, b"")
+        return FakeResponse(body={"name": "app"}, headers={"ETag": '"v1"'})
+
+
+def test_client_revalidates_and_serves_304_from_cache(cache):
+    client = GitHubClient(cache=cache)
+    client.session = RevalidatingSession()
+    
+    assert client._make_request("repos/octo/app") == {"name": "app"}
+    assert client._make_request("repos/octo/app") == {"name": "app"}
+    assert client.session.sent_headers == [{}, {"If-None-Match": '"v1"'}]
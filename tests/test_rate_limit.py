@@ -0,0 +1,97 @@
+"""
+Tests for the header-driven rate-limit budget.
+"""
+import pytest
+
+from src.core import rate_limit
+from src.core.rate_limit import RateLimitBudget
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; sleeping advances the clock."""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def headers(remaining, reset, limit=5000, resource="core"):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+        "X-RateLimit-Resource": resource,
+    }
+
+
+def test_full_speed_until_headers_are_seen(clock):
+    budget = RateLimitBudget()
+    for _ in range(10):
+        budget.acquire()
+    assert clock.sleeps == []
+    assert budget.remaining() is None
+
+
+def test_requests_count_down_the_remaining_quota(clock):
+    budget = RateLimitBudget(reserve=10)
+    budget.update(headers(remaining=4000, reset=clock.now + 3600))
+    for _ in range(5):
+        budget.acquire()
+    assert budget.remaining() == 3995
+    assert clock.sleeps == []
+
+
+def test_reserve_waits_for_the_reset(clock):
+    budget = RateLimitBudget(reserve=10)
+    budget.update(headers(remaining=10, reset=clock.now + 100))
+    budget.acquire()
+    # Waits past the reset, then assumes a fresh window.
+    assert clock.sleeps == [101]
+    assert budget.remaining() == 4999
+
+
+def test_low_quota_is_paced_over_the_window(clock):
+    budget = RateLimitBudget(reserve=0, pace_below=0.2)
+    budget.update(headers(remaining=100, reset=clock.now + 1000, limit=1000))
+    budget.acquire()
+    budget.acquire()
+    assert clock.sleeps == [pytest.approx(10.0)]
+
+
+def test_out_of_order_responses_keep_the_lower_count(clock):
+    budget = RateLimitBudget()
+    reset = clock.now + 3600
+    budget.update(headers(remaining=3000, reset=reset))
+    budget.update(headers(remaining=3500, reset=reset))
+    assert budget.remaining() == 3000
+    budget.update(headers(remaining=4999, reset=reset + 3600))
+    assert budget.remaining() == 4999
+
+
+def test_resources_have_separate_budgets(clock):
+    budget = RateLimitBudget(reserve=10)
+    budget.update(headers(remaining=10, reset=clock.now + 100, resource="graphql"))
+    budget.acquire("core")
+    assert clock.sleeps == []
+    assert budget.remaining("graphql") == 10
+
+
+def test_block_for_holds_back_every_resource(clock):
+    budget = RateLimitBudget()
+    budget.block_for(30)
+    budget.acquire("search")
+    assert clock.sleeps == [30]
@@ -0,0 +1,89 @@
+"""
+Tests for the reference index and its saved form.
+"""
+import subprocess
+import sys
+
+import pytest
+
+from src.core.code_comparison import CodeComparisonEngine
+from src.core.fingerprint import fingerprint_set, fingerprint_tokens
+from src.core.reference_index import ReferenceIndexBuilder, open_indexes, save_indexes
+
+PARAMS = {"source": "corpus", "kgram_size": 8}
+
+
+def tokens(prefix, count=80):
+    return [f"{prefix}{i % 23}" for i in range(count)]
+
+
+def build_index():
+    builder = ReferenceIndexBuilder(PARAMS)
+    builder.add("a.py", 100, fingerprint_tokens(tokens("a")), "hash-a")
+    builder.add("b.py", 200, fingerprint_tokens(tokens("b")), "hash-b")
+    return builder.build()
+
+
+def test_query_ranks_the_matching_file_first():
+    index = build_index()
+    matches = index.query(fingerprint_set(fingerprint_tokens(tokens("a"))))
+    assert matches[0].path == "a.py"
+    assert matches[0].similarity == pytest.approx(1.0)
+    assert index.find_exact("hash-b").path == "b.py"
+
+
+def test_saved_index_round_trip(tmp_path):
+    index = build_index()
+    path = str(tmp_path / "index.bin")
+    save_indexes(path, {"files": index})
+    opened = open_indexes(path)["files"]
+    
+    assert opened.is_mapped and not index.is_mapped
+    assert opened.params == PARAMS
+    assert opened.files == index.files
+    assert opened.distinct_fingerprints == index.distinct_fingerprints
+    query = fingerprint_set(fingerprint_tokens(tokens("b")))
+    assert opened.query(query) == index.query(query)
+
+
+def test_open_rejects_other_files(tmp_path):
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        open_indexes(str(path))
+
+
+def write_reference(path, name):
+    path.write_text(
+        f"def {name}(values):\n"
+        "    total = 0\n"
+        "    for value in values:\n"
+        "        if value % 2:\n"
+        "            total += value * 3\n"
+        "        else:\n"
+        "            total -= value\n"
+        "    return total\n"
+    )
+
+
+def test_saved_index_is_rebuilt_after_the_corpus_changes(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write_reference(corpus / "a.py", "first")
+    index_path = str(tmp_path / "index.bin")
+    CodeComparisonEngine(str(corpus), index_path=index_path).save_reference_index(index_path)
+    
+    reopened = CodeComparisonEngine(str(corpus), index_path=index_path)
+    assert reopened.reference_index.is_mapped
+    
+    (corpus / "b.js").write_text("function other(a, b) { return a * b + a - b; }\n")
+    rebuilt = CodeComparisonEngine(str(corpus), index_path=index_path)
+    assert not rebuilt.reference_index.is_mapped
+    assert len(rebuilt.reference_index) == 2
+
+
+def test_comparison_workers_do_not_import_the_http_stack():
+    # Worker processes import the comparison modules; requests and urllib3 are dead weight there.
+    code = "import sys, src.core.code_comparison; print(sorted({'requests', 'urllib3'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
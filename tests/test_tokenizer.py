@@ -0,0 +1,45 @@
+"""
+Tests for code normalization.
+"""
+from src.core.tokenizer import tokenize_code
+
+
+def test_python_renaming_and_comments_do_not_change_tokens():
+    original = (
+        "import os\n"
+        "def total(values):\n"
+        "    \"\"\"Sum the values.\"\"\"\n"
+        "    # running sum\n"
+        "    result = 0\n"
+        "    for value in values:\n"
+        "        result += value * 2\n"
+        "    return result\n"
+    )
+    renamed = (
+        "def add_up(items):\n"
+        "    acc = 0\n"
+        "    for item in items:\n"
+        "        acc += item * 7\n"
+        "    return acc\n"
+    )
+    tokens = tokenize_code(original, "a.py")
+    assert tokens == tokenize_code(renamed, "b.py")
+    assert "os" not in tokens and "total" not in tokens
+    assert "for" in tokens and "return" in tokens
+
+
+def test_c_family_renaming_literals_and_comments():
+    original = "const x = require('x');\nfunction f(a) { /* note */ return a + 1; } // done\n"
+    renamed = "const y = require('y');\nfunction g(b) { return b + 42; }\n"
+    tokens = tokenize_code(original, "a.js")
+    assert tokens == tokenize_code(renamed, "b.js")
+    assert "function" in tokens and "return" in tokens
+    assert "note" not in tokens and "done" not in tokens
+
+
+def test_structure_changes_tokens():
+    assert tokenize_code("if (a) { b(); }", "a.js") != tokenize_code("while (a) { b(); }", "a.js")
+
+
+def test_hash_comments_in_shell_style_languages():
+    assert tokenize_code("x = 1 # note\n", "a.rb") == tokenize_code("y = 2\n", "b.rb")